@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Content-addressed cache for downloaded archives, shared by all installers of
+the csspin-ce plugins.
+
+The cache lives in ``contact_elements.cache.directory`` and is laid out as
+follows::
+
+    objects/<sha256>/<archive name>   the archives, named by their content
+    urls/<sha256 of the url>.json     maps an URL to the archive's sha256
+    tmp/<sha256 of the url>           partial downloads to be resumed
+    tmp/<sha256 of the url>.lock      held while downloading the url
+
+The least recently used archives are evicted as soon as the cache grows
+beyond ``contact_elements.cache.max_size`` megabytes.
+
+Archives can be exported into a bundle and imported from it into another
+cache, e.g. for provisioning without network access.
+"""
+
+import hashlib
+import http.client
+import io
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+
+from csspin import debug, die, echo, mkdir, rmtree, warn
+from path import Path
+
+from csspin_ce._download import download, forget_mirror, rank_mirrors, stream
+from csspin_ce._trace import annotate, span
+from csspin_ce._utils import (
+    extract,
+    extract_stream,
+    file_lock,
+    is_tar,
+    write_json,
+)
+
+#: Partial downloads not resumed within this number of seconds are removed.
+_MAX_PARTIAL_AGE = 7 * 24 * 60 * 60
+
+_IN_USE = set()
+_IN_USE_LOCK = threading.Lock()
+
+
+def _sha256(path):
+    """Compute the sha256 hexdigest of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for chunk in iter(lambda: fd.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _url_key(url):
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def _cache_dir(cfg):
+    return Path(cfg.contact_elements.cache.directory)
+
+
+def lookup(cfg, url, sha256=None):
+    """
+    Return the path of the cached archive for ``url`` or ``None`` if it is not
+    cached. If ``sha256`` is given, only an archive with this digest matches.
+    """
+    cache = _cache_dir(cfg)
+    try:
+        entry = json.loads((cache / "urls" / f"{_url_key(url)}.json").read_text())
+    except (OSError, ValueError):
+        return None
+    if sha256 and entry["sha256"] != sha256:
+        return None
+
+    archive = cache / "objects" / entry["sha256"] / entry["name"]
+    if not archive.is_file():
+        return None
+
+    # The modification time of an archive is its last access, which is used
+    # for evicting the least recently used archives.
+    os.utime(archive)
+    return archive
+
+
+def staging_path(cfg, url):
+    """
+    Return the path to download ``url`` to, before it is moved into the cache
+    by :py:func:`store`.
+    """
+    mkdir(tmp_dir := _cache_dir(cfg) / "tmp")
+    return tmp_dir / _url_key(url)
+
+
+def store(cfg, url, path, sha256=None):
+    """
+    Move the archive at ``path`` downloaded from ``url`` into the cache and
+    return its new location.
+    """
+    digest = _sha256(path)
+    if sha256 and digest != sha256:
+        die(f"Checksum mismatch for {url}: expected {sha256}, got {digest}.")
+
+    cache = _cache_dir(cfg)
+    name = Path(urlparse(url).path).basename() or "archive"
+    archive = cache / "objects" / digest / name
+    mkdir(archive.dirname())
+    os.replace(path, archive)
+    _register(cfg, url, archive)
+    evict(cfg, keep=digest)
+    return archive
+
+
+def _register(cfg, url, archive):
+    """Make the cached ``archive`` the one to use for ``url``."""
+    write_json(
+        _cache_dir(cfg) / "urls" / f"{_url_key(url)}.json",
+        {
+            "url": url,
+            "sha256": archive.dirname().basename(),
+            "name": archive.basename(),
+        },
+    )
+
+
+def lock(cfg, url):
+    """
+    Context manager serializing downloading ``url`` into the cache, which
+    other spin processes sharing the cache may do concurrently.
+    """
+    return file_lock(_cache_dir(cfg) / "tmp" / f"{_url_key(url)}.lock")
+
+
+def fetch(cfg, url, sha256=None, extract_to=None, member=""):
+    """
+    Return the path of the archive behind ``url``, downloading it into the
+    cache unless it already is. ``HTTPError`` and ``URLError`` raised by the
+    download are passed on to the caller.
+
+    If ``extract_to`` is given, the members of the archive starting with
+    ``member`` are extracted into it. Tar archives are extracted while they
+    are downloaded.
+
+    The archive is protected from eviction for the rest of the spin run.
+    """
+    with span("fetch", url=url):
+        extracted = False
+        if archive := lookup(cfg, url, sha256):
+            debug(f"Using cached {url} ({archive})")
+            annotate(cache="hit")
+        else:
+            with lock(cfg, url):
+                # Another process may have downloaded it while waiting for the lock.
+                if archive := lookup(cfg, url, sha256):
+                    debug(f"Using {url} downloaded meanwhile ({archive})")
+                    annotate(cache="hit")
+                else:
+                    annotate(cache="miss")
+                    archive, extracted = _download(cfg, url, sha256, extract_to, member)
+
+        with _IN_USE_LOCK:
+            _IN_USE.add(archive.dirname().basename())
+        if extract_to is not None and not extracted:
+            extract(
+                archive,
+                extract_to,
+                member,
+                workers=int(cfg.contact_elements.extract.workers),
+            )
+        return archive
+
+
+def _download(cfg, url, sha256, extract_to, member):
+    """
+    Download ``url`` into the cache, extracting it while downloading if
+    possible. Returns the path of the archive and whether it got extracted.
+    """
+    extracted = False
+    # Interrupted downloads are kept, so that the next attempt resumes them.
+    partial = staging_path(cfg, url)
+    if (
+        extract_to is not None
+        and is_tar(url)
+        and not partial.exists()
+        and int(cfg.contact_elements.download.segments) <= 1
+    ):
+        extracted = _stream_extract(cfg, url, partial, extract_to, member)
+    if not extracted:
+        download(cfg, url, partial)
+    try:
+        return store(cfg, url, partial, sha256), extracted
+    finally:
+        partial.remove_p()
+
+
+def _stream_extract(cfg, url, partial, extract_to, member):
+    """
+    Download ``url`` to ``partial`` while extracting it. Returns whether
+    extracting succeeded, otherwise the download is to be resumed.
+    """
+    try:
+        with stream(cfg, url, partial) as fileobj:
+            echo(f"Extracting {url} to {extract_to}")
+            extract_stream(fileobj, extract_to, member)
+        return True
+    except (OSError, http.client.HTTPException, tarfile.TarError) as exc:
+        if not partial.exists() or not partial.size:
+            partial.remove_p()
+            raise
+        warn(f"Extracting {url} while downloading failed ({exc!r})")
+        return False
+
+
+def evict(cfg, keep=None):
+    """
+    Remove the least recently used archives until the cache fits into
+    ``contact_elements.cache.max_size`` megabytes. Archives in use by the
+    current process and the one with the digest ``keep`` are retained.
+    Partial downloads that haven't been resumed for a week are removed, too.
+    """
+    if (tmp_dir := _cache_dir(cfg) / "tmp").is_dir():
+        for partial in tmp_dir.files():
+            if (
+                partial.suffix != ".lock"
+                and partial.mtime < time.time() - _MAX_PARTIAL_AGE
+            ):
+                debug(f"Removing stale partial download {partial}")
+                partial.remove_p()
+
+    max_size = int(cfg.contact_elements.cache.max_size) * 1024 * 1024
+    objects = _cache_dir(cfg) / "objects"
+    if not objects.is_dir():
+        return
+
+    entries = []
+    for obj in objects.dirs():
+        files = obj.files()
+        entries.append(
+            (
+                max((f.mtime for f in files), default=0),
+                sum(f.size for f in files),
+                obj,
+            )
+        )
+
+    total = sum(size for _, size, _ in entries)
+    with _IN_USE_LOCK:
+        retained = _IN_USE | {keep}
+    for _, size, obj in sorted(entries):
+        if total <= max_size:
+            break
+        if obj.basename() in retained:
+            continue
+        debug(f"Evicting {obj} from the download cache")
+        rmtree(obj)
+        total -= size
+
+
+def mirror_urls(mirrors, url_path):
+    """Return the URLs of ``url_path`` on each of ``mirrors``."""
+    return [
+        f"{mirror}{url_path}" if mirror[-1] == "/" else f"{mirror}/{url_path}"
+        for mirror in mirrors
+    ]
+
+
+def fetch_first(cfg, urls, what, **kwargs):
+    """
+    Fetch the archive provided by each of ``urls``, e.g. the same path on
+    several mirrors, from the fastest one, falling back to the next fastest
+    one on failure, or to the order of ``urls`` if none of them is known to
+    be available. ``what`` names the downloaded software in warnings and
+    errors. Further keyword arguments are passed to :py:func:`fetch`.
+
+    Returns the URL the archive has been fetched from and its path.
+    """
+    for url in urls:
+        if lookup(cfg, url):
+            annotate(mirror=url)
+            return url, fetch(cfg, url, **kwargs)
+    if len(urls) == 1:
+        return urls[0], fetch(cfg, urls[0], **kwargs)
+
+    ranking = _cache_dir(cfg) / "mirrors.json"
+    # Probing may fail while downloading works, so try the mirrors in their
+    # configured order if none of them answered.
+    for url in rank_mirrors(cfg, urls, ranking) or urls:
+        try:
+            archive = fetch(cfg, url, **kwargs)
+            annotate(mirror=url)
+            return url, archive
+        except HTTPError:
+            warn(f"{what} not found at {url}")
+        except URLError:
+            warn(f"{url} currently not reachable")
+        forget_mirror(ranking, url)
+
+    return die(f"Could not download {what} from any of the mirrors.")
+
+
+#: Version of the layout of the bundles written by :py:func:`export_bundle`.
+_BUNDLE_FORMAT = 1
+
+
+def export_bundle(cfg, artifacts, bundle):
+    """
+    Write the cached ``artifacts``, a dict mapping URLs to the paths of their
+    archives, into the uncompressed tar archive ``bundle``. Its first member
+    ``index.json`` maps each URL to its archive, which follow as
+    ``objects/<sha256>/<name>`` like in the cache.
+    """
+    index = {
+        "format": _BUNDLE_FORMAT,
+        "artifacts": [
+            {
+                "url": url,
+                "sha256": archive.dirname().basename(),
+                "name": archive.basename(),
+                "size": archive.size,
+            }
+            for url, archive in artifacts.items()
+        ],
+    }
+    data = json.dumps(index, indent=2).encode()
+    mkdir(Path(bundle).dirname())
+    # The archives are compressed already.
+    with tarfile.open(bundle, "w") as tar:
+        info = tarfile.TarInfo("index.json")
+        info.size = len(data)
+        info.mtime = int(time.time())
+        tar.addfile(info, io.BytesIO(data))
+        for archive in sorted(set(artifacts.values())):
+            tar.add(archive, arcname=archive.relpath(_cache_dir(cfg)))
+
+
+def import_bundle(cfg, bundle):
+    """
+    Add the archives of ``bundle`` written by :py:func:`export_bundle` to the
+    cache, so that fetching their URLs doesn't need any network access.
+    Returns the URLs imported.
+    """
+    with tarfile.open(bundle, "r|") as tar:
+        member = tar.next()
+        if member is None or member.name != "index.json":
+            die(f"{bundle} is not a bundle of csspin-ce.")
+        index = json.load(tar.extractfile(member))
+        if index.get("format") != _BUNDLE_FORMAT:
+            die(f"Unsupported format of bundle {bundle}: {index.get('format')}")
+
+        urls = {}
+        for artifact in index["artifacts"]:
+            urls.setdefault(artifact["sha256"], []).append(artifact["url"])
+
+        for member in tar:
+            if not member.isfile():
+                continue
+            sha256 = Path(member.name).dirname().basename()
+            if sha256 not in urls:
+                continue
+            first, *others = urls.pop(sha256)
+            if not (archive := lookup(cfg, first, sha256)):
+                with open(partial := staging_path(cfg, first), "wb") as fd:
+                    shutil.copyfileobj(tar.extractfile(member), fd, 1024 * 1024)
+                try:
+                    archive = store(cfg, first, partial, sha256)
+                finally:
+                    partial.remove_p()
+            with _IN_USE_LOCK:
+                _IN_USE.add(sha256)
+            for url in others:
+                _register(cfg, url, archive)
+
+    if urls:
+        die(f"{bundle} lacks the archives of {', '.join(sum(urls.values(), []))}.")
+    return [artifact["url"] for artifact in index["artifacts"]]
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Resumable downloads based on HTTP range requests.
+
+Partially downloaded files are kept, so that an interrupted download continues
+where it stopped instead of starting over. Large files can optionally be
+fetched in several byte ranges concurrently.
+
+Mirrors are ranked by probing them concurrently, so that downloads start at
+the fastest mirror providing a file.
+"""
+
+import http.client
+import importlib.metadata
+import json
+import shutil
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from urllib.error import HTTPError
+
+from csspin import debug, die, echo, mkdir, warn
+from path import Path
+
+from csspin_ce._trace import count
+from csspin_ce._utils import write_json
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _request(cfg, url, method="GET", headers=None, timeout=None):
+    """Open ``url`` using the timeout of ``contact_elements.download``."""
+    request = urllib.request.Request(
+        url,
+        method=method,
+        headers={
+            "User-Agent": (
+                f"csspin/v{importlib.metadata.version('csspin')}"
+                " (https://github.com/cslab/csspin)"
+            ),
+            **(headers or {}),
+        },
+    )
+    return urllib.request.urlopen(  # nosec: urllib_urlopen
+        request, timeout=timeout or int(cfg.contact_elements.download.timeout)
+    )
+
+
+def _transfer(cfg, url, part, first=0, last=None):
+    """
+    Append the bytes ``first`` to ``last`` of ``url`` to the file ``part``,
+    starting after the bytes it already contains. ``last=None`` denotes the
+    end of the file.
+
+    Dropped connections are resumed up to ``contact_elements.download.retries``
+    times, as long as they delivered any data. Other errors, e.g. an
+    unreachable host, are raised immediately.
+    """
+    retries = int(cfg.contact_elements.download.retries)
+    ranged = bool(first) or last is not None
+    while True:
+        have = part.size if part.exists() else 0
+        if last is not None and first + have > last:
+            return
+        headers = {}
+        if first + have or last is not None:
+            headers["Range"] = f"bytes={first + have}-{'' if last is None else last}"
+
+        received = 0
+        try:
+            with _request(cfg, url, headers=headers) as response:
+                if response.status != 206:
+                    if ranged:
+                        die(f"{url} doesn't support range requests.")
+                    # The server ignored the range and sends the whole file.
+                    have = 0
+                expected = response.headers.get("Content-Length")
+                with open(part, "ab" if have else "wb") as fd:
+                    while chunk := response.read(_CHUNK_SIZE):
+                        fd.write(chunk)
+                        received += len(chunk)
+            if expected is not None and received < int(expected):
+                raise http.client.IncompleteRead(b"", int(expected) - received)
+            return
+        except HTTPError as exc:
+            # The range starts at the end of the file, which is thus complete.
+            if exc.code == 416 and have and not ranged:
+                return
+            raise
+        except (OSError, http.client.HTTPException) as exc:
+            if not received or retries <= 0:
+                raise
+            retries -= 1
+            warn(f"Download of {url} interrupted ({exc!r}), resuming")
+
+
+def _segmented(cfg, url, location, segments):
+    """
+    Download ``url`` to ``location`` in ``segments`` concurrently fetched byte
+    ranges. Returns ``False`` without downloading anything, if the server
+    doesn't support range requests or the file is too small to be split.
+    """
+    try:
+        with _request(cfg, url, method="HEAD") as response:
+            size = int(response.headers.get("Content-Length") or 0)
+            accepts_ranges = response.headers.get("Accept-Ranges") == "bytes"
+    except HTTPError as exc:
+        if exc.code in (403, 405):
+            return False
+        raise
+
+    min_size = int(cfg.contact_elements.download.min_segment_size) * 1024 * 1024
+    if not accepts_ranges or size < segments * min_size:
+        return False
+
+    debug(f"Downloading {url} in {segments} segments")
+    bounds = [
+        (i * size // segments, (i + 1) * size // segments - 1) for i in range(segments)
+    ]
+    parts = [location.dirname() / f"{location.basename()}.{i}" for i in range(segments)]
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        for future in [
+            executor.submit(_transfer, cfg, url, part, first, last)
+            for part, (first, last) in zip(parts, bounds)
+        ]:
+            future.result()
+
+    _concatenate(parts, location)
+    if location.size != size:
+        location.remove()
+        die(f"Download of {url} is corrupt: expected {size} bytes.")
+    return True
+
+
+def _concatenate(parts, location):
+    """Concatenate the files ``parts`` into ``location`` and remove them."""
+    with open(location, "wb") as fd:
+        for part in parts:
+            with open(part, "rb") as segment:
+                shutil.copyfileobj(segment, fd, _CHUNK_SIZE)
+    for part in parts:
+        part.remove()
+
+
+class _Tee:  # pylint: disable=too-few-public-methods
+    """Readable file-like object writing all bytes read to ``sink``, too."""
+
+    def __init__(self, source, sink):
+        self._source = source
+        self._sink = sink
+
+    def read(self, size=-1):
+        """Read up to ``size`` bytes from the source."""
+        data = self._source.read(size)
+        self._sink.write(data)
+        return data
+
+
+@contextmanager
+def stream(cfg, url, location):
+    """
+    Context manager yielding a readable file-like object for ``url``, which
+    saves all bytes read to ``location``. The remaining bytes are read on
+    exit, so that ``location`` is complete afterwards.
+
+    In case of errors, ``location`` is kept as partial download to be resumed
+    by :py:func:`download`.
+    """
+    location = Path(location)
+    mkdir(location.dirname())
+    echo(f"Download {url} -> {location} ...")
+    with _request(cfg, url) as response, open(location, "wb") as fd:
+        try:
+            yield (tee := _Tee(response, fd))
+            while tee.read(_CHUNK_SIZE):
+                pass
+        finally:
+            count("bytes_downloaded", fd.tell())
+        expected = response.headers.get("Content-Length")
+        if expected is not None and fd.tell() < int(expected):
+            raise http.client.IncompleteRead(b"", int(expected) - fd.tell())
+
+
+def download(cfg, url, location):
+    """
+    Download ``url`` to ``location``. If ``location`` already exists, it is
+    considered as partial download and resumed.
+
+    ``HTTPError`` and ``URLError`` are passed on to the caller.
+    """
+    location = Path(location)
+    mkdir(location.dirname())
+    echo(f"Download {url} -> {location} ...")
+
+    have = location.size if location.exists() else 0
+    segments = int(cfg.contact_elements.download.segments)
+    if not (segments > 1 and not have and _segmented(cfg, url, location, segments)):
+        _transfer(cfg, url, location)
+    count("bytes_downloaded", location.size - have)
+
+
+def _probe(cfg, url):
+    """
+    Return the time in seconds it took to request the headers of ``url`` or
+    ``None``, if it is not available.
+    """
+    start = time.monotonic()
+    try:
+        with _request(
+            cfg,
+            url,
+            method="HEAD",
+            timeout=int(cfg.contact_elements.download.probe_timeout),
+        ):
+            pass
+    except HTTPError as exc:
+        # Some servers refuse HEAD requests, but serve the file nevertheless.
+        if exc.code not in (405, 501):
+            return None
+    except (OSError, http.client.HTTPException):
+        return None
+    return time.monotonic() - start
+
+
+def _read_ranking(ranking_file):
+    try:
+        return json.loads(ranking_file.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def rank_mirrors(cfg, urls, ranking_file):
+    """
+    Return the ``urls`` that are available, sorted by their latency. The
+    ``urls`` are probed concurrently and the latencies of the available ones
+    are remembered in ``ranking_file`` for
+    ``contact_elements.download.mirror_ttl`` seconds. Failed probes aren't
+    remembered, since their failure may be transient.
+    """
+    now = time.time()
+    ttl = int(cfg.contact_elements.download.mirror_ttl)
+    ranking = {
+        url: entry
+        for url, entry in _read_ranking(ranking_file).items()
+        if now - entry["time"] < ttl
+    }
+
+    if stale := [url for url in urls if url not in ranking]:
+        debug(f"Probing {', '.join(stale)}")
+        with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+            for url, latency in zip(stale, executor.map(partial(_probe, cfg), stale)):
+                ranking[url] = {"latency": latency, "time": now}
+        write_json(
+            ranking_file,
+            {
+                url: entry
+                for url, entry in ranking.items()
+                if entry["latency"] is not None
+            },
+        )
+
+    return sorted(
+        (url for url in urls if ranking[url]["latency"] is not None),
+        key=lambda url: ranking[url]["latency"],
+    )
+
+
+def forget_mirror(ranking_file, url):
+    """Remove ``url`` from the ranking, so that it is probed again next time."""
+    ranking = _read_ranking(ranking_file)
+    if ranking.pop(url, None):
+        write_json(ranking_file, ranking)
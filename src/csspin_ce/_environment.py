@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cache of the environment computed by the init hooks of the csspin-ce plugins.
+
+The init hooks run for every spin command, while the environment they compute
+only changes with the configuration or by provisioning. Thus, it is stored in
+``{spin.spin_dir}/csspin_ce/init_environment.json`` per plugin, along with a
+hash of the configuration it has been computed from, and removed whenever
+provisioning.
+"""
+
+import hashlib
+import json
+
+from path import Path
+
+from csspin_ce._utils import write_json
+
+
+def _cache_file(cfg):
+    return Path(cfg.spin.spin_dir) / "csspin_ce" / "init_environment.json"
+
+
+def cached_environment(cfg, plugin, key, compute):
+    """
+    Return the environment variables of ``plugin``, computed by calling
+    ``compute`` unless they are cached for ``key``, the configuration they
+    depend on.
+    """
+    digest = hashlib.sha256(
+        json.dumps(key, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    try:
+        entries = json.loads(_cache_file(cfg).read_text())
+    except (OSError, ValueError):
+        entries = {}
+    if (entry := entries.get(plugin)) and entry["key"] == digest:
+        return dict(entry["environment"])
+
+    environment = {name: str(value) for name, value in compute().items()}
+    entries[plugin] = {"key": digest, "environment": environment}
+    write_json(_cache_file(cfg), entries)
+    return dict(environment)
+
+
+def invalidate_environment(cfg):
+    """Remove the cached environment, e.g. since the tools are provisioned."""
+    _cache_file(cfg).remove_p()
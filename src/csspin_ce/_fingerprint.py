@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fingerprints of the sources the steps updating an instance depend on.
+
+The fingerprint of each step run for an instance, like ``webmake devupdate``,
+is recorded in the instance, so that the step can be skipped as long as its
+sources don't change. The files of the project are listed by git, leaving out
+ignored ones like the instances and ``node_modules``, unless the project isn't
+a git repository. Like make, the files are compared by their size and
+modification time instead of their content.
+"""
+
+import json
+import os
+import subprocess  # nosec: import_subprocess
+from fnmatch import fnmatch
+
+from csspin import debug
+from path import Path
+
+from csspin_ce._utils import fingerprint, write_json
+
+#: The file within the instance recording the fingerprints of the steps.
+_STORE = "spin_fingerprints.json"
+
+
+def _git_files(root):
+    """The files of the git repository ``root`` that aren't ignored, or ``None``."""
+    try:
+        output = subprocess.run(  # nosec: subprocess_without_shell_equals_true
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root,
+            capture_output=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [name for name in output.decode().split("\0") if name]
+
+
+def _walk_files(root, exclude):
+    """
+    The files below ``root``, leaving out the instances and the directories
+    named like ``exclude``.
+    """
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            name
+            for name in dirnames
+            if not any(fnmatch(name, pattern) for pattern in exclude)
+            and not os.path.exists(os.path.join(dirpath, name, _STORE))
+        ]
+        relative = os.path.relpath(dirpath, root)
+        files.extend(
+            os.path.normpath(os.path.join(relative, name)).replace(os.sep, "/")
+            for name in filenames
+        )
+    return files
+
+
+def _outside_instances(root, files):
+    """
+    The ``files`` below ``root`` that aren't part of an instance, i.e. of a
+    directory holding the fingerprints of the steps run for it.
+    """
+    instances = {"": False}
+
+    def in_instance(directory):
+        if directory not in instances:
+            instances[directory] = os.path.exists(
+                os.path.join(root, directory, _STORE)
+            ) or in_instance(os.path.dirname(directory))
+        return instances[directory]
+
+    return [name for name in files if not in_instance(os.path.dirname(name))]
+
+
+def source_files(root, exclude):
+    """
+    The relative paths of the files of the project ``root``, using the
+    patterns ``exclude`` if it isn't a git repository.
+    """
+    if (files := _git_files(root)) is None:
+        debug(f"Walking {root}, since it isn't a git repository")
+        files = _walk_files(root, exclude)
+    else:
+        # The instances may not be ignored by git.
+        files = _outside_instances(root, files)
+    return sorted(files)
+
+
+def sources_fingerprint(root, files, patterns, **parts):
+    """
+    The fingerprint of the ``files`` below ``root`` matching one of
+    ``patterns``, along with ``parts``.
+    """
+    sources = []
+    for name in files:
+        if any(fnmatch(name, pattern) for pattern in patterns):
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except OSError:
+                # Deleted, but not staged yet.
+                continue
+            sources.append((name, stat.st_size, stat.st_mtime_ns))
+    return fingerprint(sources=sources, **parts)
+
+
+def recorded(instancedir):
+    """The fingerprints of the steps run for ``instancedir``."""
+    try:
+        return json.loads((Path(instancedir) / _STORE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def record(instancedir, step, key):
+    """Record that ``step`` ran for ``instancedir`` with the fingerprint ``key``."""
+    write_json(Path(instancedir) / _STORE, recorded(instancedir) | {step: key})
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Runs a graph of named jobs on a bounded pool of worker threads, starting each
+job as soon as all of its requirements succeeded.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from click import Abort
+from csspin import debug, die, error
+
+from csspin_ce._trace import inherit, open_spans, span
+
+
+def _run(name, job, parents):
+    with inherit(parents), span(name):
+        job()
+
+
+def run_jobs(jobs, max_workers=1):
+    """
+    Run the jobs described by ``jobs``, a dict mapping a job's name to a tuple
+    of a callable without arguments and an iterable of names of the jobs that
+    must have succeeded before it may start. Requirements that are not part of
+    ``jobs`` are considered as satisfied.
+
+    A failing job does not cancel the jobs that are independent of it, but
+    the jobs requiring it are skipped. Once all jobs are done, every failure
+    is reported per job and spin terminates. The wall time of each job is
+    recorded as span named like the job, enclosed by the spans open when
+    calling this function.
+    """
+    pending = {
+        name: {req for req in requires if req in jobs}
+        for name, (_, requires) in jobs.items()
+    }
+    succeeded, failed, skipped = set(), {}, set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending or running:
+            for name, requires in list(pending.items()):
+                if requires & (failed.keys() | skipped):
+                    debug(f"Skipping '{name}', since its requirements failed")
+                    skipped.add(name)
+                    del pending[name]
+                elif requires <= succeeded:
+                    running[
+                        executor.submit(_run, name, jobs[name][0], open_spans())
+                    ] = name
+                    del pending[name]
+
+            if not running:
+                if pending:
+                    die(f"Cyclic requirements between {', '.join(sorted(pending))}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    future.result()
+                except Abort as exc:
+                    # die() already reported the error message.
+                    failed[name] = exc
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    error(f"{name}: {exc}", resolve=False)
+                    failed[name] = exc
+                else:
+                    succeeded.add(name)
+
+    if failed or skipped:
+        for name in sorted(skipped):
+            error(
+                f"{name}: skipped, since one of its requirements failed",
+                resolve=False,
+            )
+        die(
+            f"Failed to provision {', '.join(sorted(failed.keys() | skipped))}.",
+            resolve=False,
+        )
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Manifest of the tools installed by the plugins of csspin-ce.
+
+The manifest maps the location of each installed tool to its version, the URL
+and sha256 of the archive it was installed from and a fingerprint of the
+installed files. An entry is only recorded once an installation completed, so
+that interrupted installations are detected and redone, instead of being
+mistaken for valid ones just because their directory exists.
+
+Tools are built in a staging directory next to their final location, which is
+renamed into place once complete. Lock files serialize installing the same
+location and updating the manifest, e.g. by several CI jobs sharing
+``spin.data``.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from csspin import debug, exists, mkdir, rmtree, warn
+from path import Path
+
+from csspin_ce._trace import annotate
+from csspin_ce._utils import file_lock, write_json
+
+
+def fingerprint(path):
+    """
+    Compute a fingerprint of the file or directory tree at ``path`` from the
+    relative paths and sizes of its files, which is cheap to compute, as no
+    file needs to be read.
+    """
+    path = Path(path)
+    digest = hashlib.sha256()
+    if path.is_file():
+        digest.update(f"{path.basename()}:{path.size}\n".encode())
+        return digest.hexdigest()
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            size = os.lstat(os.path.join(root, name)).st_size
+            relpath = os.path.relpath(os.path.join(root, name), path)
+            digest.update(f"{relpath.replace(os.sep, '/')}:{size}\n".encode())
+    return digest.hexdigest()
+
+
+def _read(manifest_file):
+    try:
+        return json.loads(manifest_file.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+class Manifest:
+    """
+    The manifest stored in ``contact_elements.manifest.file``. It is read once
+    when created, so that checking whether a tool is installed costs a lookup
+    and a single ``stat`` call, unless ``contact_elements.manifest.verify``
+    requests to compare the fingerprints of the installed files, too.
+    """
+
+    def __init__(self, cfg):
+        self.file = Path(cfg.contact_elements.manifest.file)
+        self.verify = cfg.contact_elements.manifest.verify
+        self._lock = threading.Lock()
+        self._entries = _read(self.file)
+
+    def installed(self, component, version, path):
+        """Whether ``version`` of ``component`` is completely installed at ``path``."""
+        entry = self._entries.get(str(path))
+        if not (
+            entry
+            and entry["component"] == component
+            and entry["version"] == str(version)
+            and exists(path)
+        ):
+            return False
+        if self.verify and fingerprint(path) != entry["fingerprint"]:
+            warn(f"The installation of {component} at {path} is corrupt")
+            return False
+        return True
+
+    def install(self, component, version, path, build):
+        """
+        Install ``version`` of ``component`` at ``path`` unless it is already
+        installed. Returns whether it has been installed.
+
+        ``build`` is called with a staging location next to ``path`` to build
+        the installation at and returns the URL and the path of the archive
+        it has been built from. The staging location is renamed to ``path``
+        afterwards, so that ``path`` never holds an incomplete installation.
+
+        A lock file ensures that only one of several processes installing to
+        the same ``path`` concurrently builds it, while the others wait for
+        it and use the result.
+        """
+        path = Path(path)
+        annotate(version=str(version), path=str(path))
+        if self.installed(component, version, path):
+            annotate(manifest="hit")
+            return False
+
+        mkdir(path.dirname())
+        with file_lock(path.dirname() / f".{path.basename()}.lock"):
+            with self._lock:
+                self._entries = _read(self.file)
+            if self.installed(component, version, path):
+                debug(f"{component} has been installed at {path} meanwhile")
+                annotate(manifest="hit")
+                return False
+            annotate(manifest="miss")
+
+            # Nobody else installs to path while holding the lock, thus
+            # remaining installations and stages have been interrupted.
+            for leftover in (
+                path,
+                *path.dirname().dirs(f".{path.basename()}.stage-*"),
+            ):
+                if leftover.is_dir():
+                    debug(f"Removing incomplete installation {leftover}")
+                    rmtree(leftover)
+                elif leftover.exists():
+                    leftover.remove()
+
+            stage = path.dirname() / f".{path.basename()}.stage-{uuid.uuid4().hex}"
+            mkdir(stage)
+            try:
+                url, archive = build(stage / path.basename())
+                os.replace(stage / path.basename(), path)
+            finally:
+                rmtree(stage)
+            self.record(component, version, path, url, archive=archive)
+        return True
+
+    def record(  # pylint: disable=too-many-arguments
+        self, component, version, path, url, *, archive=None
+    ):
+        """
+        Record the installation of ``version`` of ``component`` at ``path``
+        from the archive ``archive``, that has been downloaded from ``url``.
+        """
+        entry = {
+            "component": component,
+            "version": str(version),
+            "url": url,
+            "sha256": Path(archive).dirname().basename() if archive else None,
+            "fingerprint": fingerprint(path),
+            "time": time.time(),
+        }
+        # Other threads and processes record their installations concurrently,
+        # so merge their entries while holding both locks.
+        with (
+            self._lock,
+            file_lock(self.file.dirname() / f".{self.file.basename()}.lock"),
+        ):
+            self._entries = {**_read(self.file), str(path): entry}
+            write_json(self.file, self._entries)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Runs the commands of a matrix, like building an instance per DBMS,
+concurrently. Each command writes its output into a log of its own, since the
+interleaved output of several commands is unreadable, and the outcome and wall
+time of all commands are summarized once they are done.
+"""
+
+import os
+import subprocess  # nosec: import_subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from csspin import echo, error, info
+from path import Path
+
+
+def _run(cmd, log, **kwargs):
+    Path(log).dirname().makedirs_p()
+    start = time.monotonic()
+    with open(log, "wb") as output:
+        returncode = subprocess.run(  # nosec: subprocess_without_shell_equals_true
+            [str(arg) for arg in cmd],
+            stdin=subprocess.DEVNULL,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+            check=False,
+            **kwargs,
+        ).returncode
+    return {"returncode": returncode, "seconds": time.monotonic() - start, "log": log}
+
+
+def run_matrix(commands, max_workers=1, **kwargs):
+    """
+    Run ``commands``, a dict mapping names to tuples of a command and the log
+    file it writes its output into, optionally followed by a dict of
+    environment variables to set for the command, on ``max_workers`` threads.
+    ``kwargs`` are passed to :py:func:`subprocess.run`. Returns a dict mapping the names to
+    dicts holding the return code, wall time in seconds and log of the
+    commands.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {}
+        for name, (cmd, log, *environ) in commands.items():
+            echo(" ".join(str(arg) for arg in cmd))
+            options = dict(kwargs)
+            if environ:
+                options["env"] = dict(kwargs.get("env", os.environ)) | environ[0]
+            futures[name] = executor.submit(_run, cmd, log, **options)
+        return {name: future.result() for name, future in futures.items()}
+
+
+def report(results, started):
+    """
+    Summarize ``results`` as returned by :py:func:`run_matrix` of a matrix
+    that ``started`` at the given :py:func:`time.monotonic`. Returns whether
+    all commands succeeded.
+    """
+    for name, result in results.items():
+        summary = f"{name}: {result['seconds']:.1f}s, see {result['log']}"
+        if result["returncode"]:
+            error(f"{summary} (failed with exit code {result['returncode']})")
+        else:
+            info(summary)
+    total = sum(result["seconds"] for result in results.values())
+    info(
+        f"Ran {len(results)} commands in {time.monotonic() - started:.1f}s"
+        f" ({total:.1f}s in total)"
+    )
+    return not any(result["returncode"] for result in results.values())
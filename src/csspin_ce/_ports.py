@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Allocation of free ports to the services of several instances on one host.
+
+The ports handed out are recorded per instance in a registry shared by all
+projects on the host, so that instances whose services are not running yet
+don't get the same ports. An instance keeps its ports as long as they are
+free, while the entries of instances that have been removed are dropped.
+"""
+
+import json
+import socket
+from contextlib import ExitStack
+
+from csspin import die
+from path import Path
+
+from csspin_ce._utils import file_lock, write_json
+
+
+def _bind(port):
+    """Return a socket bound to ``port`` on all interfaces, or ``None``."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(("", port))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _read(registry):
+    try:
+        return json.loads(registry.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def allocate_ports(registry, instance, services):
+    """
+    Allocate a free port to each of ``services`` of ``instance``, which are
+    not reserved by any other instance in ``registry``. Returns a dict
+    mapping the services to their ports.
+    """
+    registry = Path(registry)
+    with file_lock(registry.dirname() / f".{registry.basename()}.lock"):
+        reserved = {
+            other: ports
+            for other, ports in _read(registry).items()
+            if Path(other).is_dir()
+        }
+        previous = reserved.pop(str(instance), {})
+        taken = {port for ports in reserved.values() for port in ports.values()}
+
+        ports = {}
+        # Keep the sockets bound until all ports are allocated, so that the
+        # operating system doesn't hand out the same port twice.
+        with ExitStack() as sockets:
+            for service in services:
+                port = previous.get(service)
+                sock = _bind(port) if port and port not in taken else None
+                while sock is None:
+                    if (sock := _bind(0)) is None:
+                        die(f"Can't allocate a free port to {service}.")
+                    if sock.getsockname()[1] in taken:
+                        sockets.enter_context(sock)
+                        sock = None
+                sockets.enter_context(sock)
+                ports[service] = sock.getsockname()[1]
+                taken.add(ports[service])
+
+        write_json(registry, {**reserved, str(instance): ports})
+    return ports
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Resource profiles sizing the JVMs of the services started by ``ce_services``.
+
+A profile grants the JVM services a share of the memory available on the host,
+which is split among them by weight, and limits the number of processors each
+JVM sizes its GC and thread pools for:
+
+``ci``
+    Several instances share a runner, thus each one gets a small share of the
+    memory, a quarter of the processors and the serial GC, which has the
+    least overhead for small heaps.
+``dev``
+    A single instance on a developer's machine, sharing it with the IDE and
+    the browser.
+``perf``
+    The host is dedicated to a single instance, e.g. for performance tests.
+"""
+
+import os
+import sys
+
+from path import Path
+
+#: Share of the memory and processors granted and the GC used per profile.
+PROFILES = {
+    "ci": (0.125, 0.25, "-XX:+UseSerialGC"),
+    "dev": (0.25, 0.5, "-XX:+UseG1GC"),
+    "perf": (0.5, 1.0, "-XX:+UseG1GC -XX:+ParallelRefProcEnabled"),
+}
+
+#: Weights of the JVM services when splitting the memory among them. Apache
+#: Tika lacks an environment variable of its own and keeps the JVM's defaults.
+_WEIGHTS = {"solr": 2, "hivemq": 1}
+
+#: Bounds of the heap size in megabytes. Larger heaps lose compressed oops.
+_MIN_HEAP = 256
+_MAX_HEAP = 31 * 1024
+
+
+def _cgroup_memory():
+    """
+    The memory still available below the limit of the cgroup (v2 or v1) of
+    the process, if any.
+    """
+    for limit, usage in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        (
+            "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+            "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+        ),
+    ):
+        try:
+            value = Path(limit).read_text().strip()
+            used = Path(usage).read_text().strip()
+        except OSError:
+            continue
+        if value.isdigit() and used.isdigit():
+            return max(0, int(value) - int(used))
+    return None
+
+
+def _meminfo_available():
+    """The memory available for starting new processes according to Linux."""
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def host_memory():
+    """
+    The memory available on the host in bytes, i.e. not used by other
+    processes, bounded by its cgroup.
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        class MemoryStatusEx(
+            ctypes.Structure
+        ):  # pylint: disable=too-few-public-methods
+            """The MEMORYSTATUSEX structure of the Windows API."""
+
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatusEx(dwLength=ctypes.sizeof(MemoryStatusEx))
+        ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+        return status.ullAvailPhys
+
+    memory = _meminfo_available()
+    if memory is None:
+        pages = (
+            "SC_AVPHYS_PAGES"
+            if "SC_AVPHYS_PAGES" in os.sysconf_names
+            else "SC_PHYS_PAGES"
+        )
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf(pages)
+    cgroup = _cgroup_memory()
+    return memory if cgroup is None else min(memory, cgroup)
+
+
+def host_processors():
+    """The number of processors available to the process."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def jvm_settings(profile, services, memory, processors):
+    """
+    Compute the settings of each of the JVM ``services`` for ``profile`` on a
+    host with ``memory`` bytes and ``processors`` processors. Returns a dict
+    mapping the services to dicts holding the heap size in megabytes, the GC
+    options and the number of processors.
+    """
+    memory_share, processor_share, gc = PROFILES[profile]
+    services = [service for service in _WEIGHTS if service in services]
+    total_weight = sum(_WEIGHTS[service] for service in services)
+    budget = int(memory * memory_share) // 2**20
+    return {
+        service: {
+            "heap": max(
+                _MIN_HEAP,
+                min(_MAX_HEAP, budget * _WEIGHTS[service] // total_weight),
+            ),
+            "gc": gc,
+            "processors": max(1, int(processors * processor_share)),
+        }
+        for service in services
+    }
+
+
+def jvm_options(settings):
+    """The JVM options applying ``settings`` computed by :py:func:`jvm_settings`."""
+    return (
+        f"-Xms{settings['heap']}m -Xmx{settings['heap']}m {settings['gc']}"
+        f" -XX:ActiveProcessorCount={settings['processors']}"
+    )
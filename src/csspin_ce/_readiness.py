@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Readiness probes for the services started by ``ce_services``.
+
+A probe is given as URL, whose scheme selects how the service is checked:
+``tcp://host:port`` merely connects, ``redis://host:port`` expects an answer
+to ``PING`` and ``http://`` or ``https://`` URLs expect any response to a GET
+request, except for server errors.
+"""
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+#: The schemes of the supported probe URLs.
+SCHEMES = ("tcp", "redis", "http", "https")
+
+#: Bounds of the exponential backoff between two probes of a service.
+_MIN_DELAY = 0.05
+_MAX_DELAY = 1.0
+
+
+def _probe_tcp(host, port, timeout):
+    with socket.create_connection((host, port), timeout=timeout):
+        return True
+
+
+def _probe_redis(host, port, timeout):
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(b"*1\r\n$4\r\nPING\r\n")
+        reply = sock.recv(64)
+    # A server requiring authentication is up nevertheless, while one still
+    # loading its dataset answers "-LOADING".
+    return reply.startswith((b"+PONG", b"-NOAUTH"))
+
+
+def _probe_http(url, timeout):
+    try:
+        with urlopen(url, timeout=timeout):  # nosec: url is configured
+            return True
+    except HTTPError as exc:
+        return exc.code < 500
+
+
+def probe(url, timeout=1.0):
+    """Check once whether the service at ``url`` is ready."""
+    parts = urlsplit(url)
+    try:
+        if parts.scheme in ("http", "https"):
+            return _probe_http(url, timeout)
+        if parts.scheme == "redis":
+            return _probe_redis(parts.hostname, parts.port or 6379, timeout)
+        if parts.scheme == "tcp":
+            return _probe_tcp(parts.hostname, parts.port, timeout)
+    except (OSError, URLError):
+        return False
+    raise ValueError(f"Unsupported readiness probe: {url}")
+
+
+def wait_until_ready(probes, timeout, stop=None):
+    """
+    Probe the services in ``probes``, a dict mapping their names to probe
+    URLs, concurrently until all of them are ready or ``timeout`` seconds
+    passed. Setting the event ``stop`` gives up waiting early.
+
+    Returns a dict mapping each name to the seconds it took until the service
+    got ready, or ``None`` if it didn't.
+    """
+    stop = stop or threading.Event()
+    start = time.monotonic()
+
+    def wait(url):
+        delay = _MIN_DELAY
+        while True:
+            if probe(url):
+                return time.monotonic() - start
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0 or stop.wait(min(delay, remaining)):
+                return None
+            delay = min(delay * 2, _MAX_DELAY)
+
+    if not probes:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {name: executor.submit(wait, url) for name, url in probes.items()}
+        return {name: future.result() for name, future in futures.items()}
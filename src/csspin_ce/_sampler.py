@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Samples the resource usage of the processes started by ``ce_services``.
+
+The CPU usage, resident memory, open file descriptors (handles on Windows) and
+threads of all descendants of a process are summed up per service in regular
+intervals. Only the latest samples are kept, like in a ring buffer, and
+written to a JSON file holding one array per service and metric, along with a
+summary of each service's peak and mean usage.
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from fnmatch import fnmatch
+
+from path import Path
+
+from csspin_ce._utils import write_json
+
+#: The metrics sampled per service.
+METRICS = ("cpu_percent", "rss", "fds", "threads", "processes")
+
+#: Patterns of the executables or main jars identifying the services among
+#: the processes, including the gatekeeper ce_services itself.
+_SERVICES = (
+    ("tika", "tika-server*.jar"),
+    ("solr", "start.jar"),
+    ("hivemq", "hivemq.jar"),
+    ("rabbitmq", "beam.smp*"),
+    ("redis", "redis-server*"),
+    ("traefik", "traefik*"),
+    ("influxdb", "influxd*"),
+    ("ce_services", "ce_services*"),
+)
+
+#: Options preceding the main program run by an interpreter, like a jar run
+#: by java, a module run by python or the command run by a shell.
+_MAIN_OPTIONS = ("-jar", "-m", "-c")
+
+#: Options of interpreters taking a value, which isn't the main program.
+_VALUE_OPTIONS = ("-cp", "-classpath", "--class-path", "-p", "--module-path")
+
+#: Number of samples after which the samples are written to the file.
+_FLUSH_EVERY = 10
+
+
+def _main_program(cmdline):
+    """The main program run by the interpreter in ``cmdline``, or ``None``."""
+    arguments = iter(cmdline[1:])
+    for argument in arguments:
+        if argument in _MAIN_OPTIONS:
+            # Shells get a command line, whose first word is the program.
+            return next(arguments, "").split(" ", 1)[0]
+        if argument in _VALUE_OPTIONS:
+            next(arguments, None)
+        elif not argument.startswith("-"):
+            return argument
+    return None
+
+
+def service_of(name, cmdline):
+    """
+    The service a process named ``name`` running ``cmdline`` belongs to,
+    identified by its executable or the main program it runs, e.g. the jar
+    run by java. Other processes are reported by their name.
+    """
+    programs = [name, *cmdline[:1], _main_program(cmdline) or ""]
+    for program in programs:
+        basename = program.replace("\\", "/").rsplit("/", 1)[-1].lower()
+        for service, pattern in _SERVICES:
+            if fnmatch(basename, pattern):
+                return service
+    return name
+
+
+class Sampler:  # pylint: disable=too-many-instance-attributes
+    """
+    Samples the descendants of the process ``pid`` every ``interval`` seconds
+    in a background thread, keeping the latest ``capacity`` samples, which are
+    written to ``file``. ``psutil`` is the imported psutil module, since it is
+    only available in the environment of the project.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, psutil, pid, file, *, interval=1.0, capacity=3600
+    ):
+        self.psutil = psutil
+        self.root = psutil.Process(pid)
+        self.file = Path(file)
+        self.interval = interval
+        self.samples = deque(maxlen=capacity)
+        self._processes = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._start = time.time()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+    def _run(self):
+        taken = 0
+        while not self._stop.wait(self.interval):
+            self.sample()
+            taken += 1
+            if taken % _FLUSH_EVERY == 0:
+                self.write()
+
+    def _usage(self, proc):
+        # Keep the process objects, since cpu_percent() measures the usage
+        # since its previous call on the same object.
+        proc = self._processes.setdefault(proc.pid, proc)
+        with proc.oneshot():
+            return service_of(proc.name(), proc.cmdline()), (
+                proc.cpu_percent(),
+                proc.memory_info().rss,
+                proc.num_handles() if sys.platform == "win32" else proc.num_fds(),
+                proc.num_threads(),
+                1,
+            )
+
+    def sample(self):
+        """Take a sample of all descendants' resource usage."""
+        services = {}
+        try:
+            children = self.root.children(recursive=True)
+        except self.psutil.Error:
+            children = []
+        for proc in children:
+            try:
+                service, usage = self._usage(proc)
+            except self.psutil.Error:
+                continue
+            total = services.get(service, (0,) * len(METRICS))
+            services[service] = tuple(map(sum, zip(total, usage)))
+        alive = {proc.pid for proc in children}
+        self._processes = {
+            pid: proc for pid, proc in self._processes.items() if pid in alive
+        }
+        self.samples.append((round(time.time() - self._start, 3), services))
+
+    def summary(self):
+        """
+        The peak of each metric per service, as well as its mean CPU usage and
+        memory, over the samples kept.
+        """
+        summary = {}
+        for _, services in self.samples:
+            for service, usage in services.items():
+                entry = summary.setdefault(
+                    service, {"samples": 0, "cpu_total": 0.0, "rss_total": 0}
+                )
+                entry["samples"] += 1
+                entry["cpu_total"] += usage[0]
+                entry["rss_total"] += usage[1]
+                for metric, value in zip(METRICS, usage):
+                    entry[f"max_{metric}"] = max(entry.get(f"max_{metric}", 0), value)
+        for entry in summary.values():
+            samples = entry.pop("samples")
+            entry["mean_cpu_percent"] = round(entry.pop("cpu_total") / samples, 1)
+            entry["mean_rss"] = entry.pop("rss_total") // samples
+        return summary
+
+    def write(self):
+        """Write the samples kept and their summary to the file."""
+        series = {}
+        for index, (_, services) in enumerate(self.samples):
+            for service, usage in services.items():
+                columns = series.setdefault(
+                    service, {"sample": [], **{metric: [] for metric in METRICS}}
+                )
+                columns["sample"].append(index)
+                for metric, value in zip(METRICS, usage):
+                    columns[metric].append(value)
+        write_json(
+            self.file,
+            {
+                "interval": self.interval,
+                "started": self._start,
+                "time": [offset for offset, _ in self.samples],
+                "services": series,
+                "summary": self.summary(),
+            },
+            indent=None,
+        )
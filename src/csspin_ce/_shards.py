@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Splits a collection of pytest based tests into shards of balanced durations,
+which run concurrently, and merges their JUnit reports.
+
+The durations of the test files are recorded from the JUnit reports of earlier
+runs. Test files without a recorded duration are assumed to take as long as
+the average test file.
+"""
+
+import json
+import os
+import shlex
+import xml.etree.ElementTree as ET  # nosec: import_xml_etree
+from fnmatch import fnmatch
+
+from csspin import warn
+from path import Path
+
+from csspin_ce._utils import write_json
+
+#: The counters of the test suites in JUnit reports.
+_COUNTERS = ("tests", "errors", "failures", "skipped")
+
+
+def collect(tests, patterns):
+    """
+    The paths of the test files below ``tests`` named like one of
+    ``patterns``, relative to it.
+    """
+    tests = Path(tests)
+    return sorted(
+        path.relpath(tests).replace(os.sep, "/")
+        for path in tests.walkfiles()
+        if any(fnmatch(path.name, pattern) for pattern in patterns)
+    )
+
+
+def balance(files, durations, count):
+    """
+    Split ``files`` into ``count`` shards of about the same duration, using
+    the ``durations`` of the files in seconds. Returns a list of the shards'
+    lists of files.
+    """
+    known = [durations[name] for name in files if name in durations]
+    default = sum(known) / len(known) if known else 1.0
+    shards = [[] for _ in range(count)]
+    totals = [0.0] * count
+    # Assign the longest files first, each one to the shortest shard.
+    for name in sorted(files, key=lambda name: (-durations.get(name, default), name)):
+        shortest = totals.index(min(totals))
+        shards[shortest].append(name)
+        totals[shortest] += durations.get(name, default)
+    return [sorted(shard) for shard in shards if shard]
+
+
+def junit_options(report):
+    """
+    The options of pytest writing the JUnit ``report`` of the xunit1 family,
+    which notes the files of the test cases, quoted for ``PYTEST_ADDOPTS``.
+    """
+    return [shlex.quote(f"--junitxml={report}"), "-o junit_family=xunit1"]
+
+
+def ignore_options(tests, files, shard):
+    """
+    The options of pytest leaving out the test ``files`` below ``tests`` that
+    aren't part of ``shard``, quoted for ``PYTEST_ADDOPTS``. Thus, all shards
+    run from the original directory, along with the conftest.py files and
+    data of the whole project.
+    """
+    shard = set(shard)
+    return [
+        shlex.quote(f"--ignore={Path(tests) / name}")
+        for name in files
+        if name not in shard
+    ]
+
+
+def _suites(report):
+    root = ET.parse(report).getroot()  # nosec: xml_bad_element_tree
+    return [root] if root.tag == "testsuite" else root.findall("testsuite")
+
+
+def read_durations(store):
+    """The durations of the test files recorded in ``store``."""
+    try:
+        return json.loads(Path(store).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def record_durations(store, reports, files):
+    """
+    Record the durations of ``files`` in ``store`` from the JUnit ``reports``.
+    Only reports whose test cases note the files they are defined in, like
+    those of the xunit1 family of pytest, can be used. Of several reports
+    covering a file, e.g. one per DBMS, the longest duration is recorded.
+    """
+    measured = {}
+    for report in reports:
+        durations = {}
+        try:
+            suites = _suites(report)
+        except (OSError, ET.ParseError):
+            continue
+        for suite in suites:
+            for case in suite.iter("testcase"):
+                path = case.get("file", "").replace("\\", "/")
+                for name in files:
+                    if path == name or path.endswith(f"/{name}"):
+                        durations[name] = durations.get(name, 0.0) + float(
+                            case.get("time", 0)
+                        )
+                        break
+        for name, seconds in durations.items():
+            measured[name] = max(seconds, measured.get(name, 0.0))
+    if measured:
+        write_json(Path(store), read_durations(store) | measured)
+
+
+def merge_junit(reports, target):
+    """
+    Merge the JUnit ``reports``, a dict mapping the names of the runs to the
+    lists of reports they wrote, into the report ``target``. The test suites
+    are suffixed by the names of the runs they come from.
+    """
+    merged = ET.Element("testsuites")
+    totals = dict.fromkeys(_COUNTERS, 0)
+    time = 0.0
+    for run, report in (
+        (run, report) for run, paths in reports.items() for report in paths
+    ):
+        try:
+            suites = _suites(report)
+        except (OSError, ET.ParseError) as exc:
+            warn(f"Can't read the JUnit report {report} of {run}: {exc}")
+            continue
+        for suite in suites:
+            suite.set("name", f"{suite.get('name', 'pytest')}[{run}]")
+            for counter in _COUNTERS:
+                totals[counter] += int(suite.get(counter, 0))
+            time += float(suite.get("time", 0))
+            merged.append(suite)
+    for counter, value in totals.items():
+        merged.set(counter, str(value))
+    merged.set("time", f"{time:.3f}")
+    Path(target).dirname().makedirs_p()
+    ET.ElementTree(merged).write(target, encoding="utf-8", xml_declaration=True)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Snapshots of the instances built by ``mkinstance``.
+
+Building an instance takes minutes, while the instance only depends on the
+options of mkinstance, the packages installed and the umbrella. Thus, after
+building an instance, it is stored as a snapshot keyed by a fingerprint of
+those, and later restored instead of building an instance with the same
+fingerprint again. Snapshots are cloned by reflinks where possible, see
+:py:func:`csspin_ce._utils.clone_tree`, but never hard-linked, since an
+instance is updated in place, e.g. by ``webmake devupdate`` right after
+restoring it, which would modify the snapshot as well.
+"""
+
+import json
+import os
+import time
+import uuid
+
+from csspin import debug, info, rmtree, warn
+from path import Path
+
+from csspin_ce._utils import clone_tree
+
+
+def restore(cfg, key, instancedir):
+    """
+    Restore the snapshot ``key`` into ``instancedir``. Returns whether there
+    is such a snapshot.
+    """
+    snapshot = Path(cfg.mkinstance.snapshots.directory) / key
+    if not (snapshot / "instance").is_dir():
+        debug(f"No snapshot of the instance {key}")
+        return False
+    try:
+        counts = clone_tree(snapshot / "instance", instancedir, hardlinks=False)
+    except OSError as exc:
+        warn(f"Can't restore the snapshot {snapshot}: {exc}")
+        rmtree(instancedir)
+        return False
+    # Mark the snapshot as used recently, see _prune().
+    os.utime(snapshot)
+    info(
+        f"Restored the instance from the snapshot {key[:12]} ({counts['cloned']}"
+        f" files cloned, {counts['copied']} copied)"
+    )
+    return True
+
+
+def store(cfg, key, instancedir):
+    """Store ``instancedir`` as the snapshot ``key``."""
+    directory = Path(cfg.mkinstance.snapshots.directory)
+    staging = directory / f".{key}.{uuid.uuid4().hex}"
+    try:
+        clone_tree(instancedir, staging / "instance", hardlinks=False)
+        (staging / "snapshot.json").write_text(
+            json.dumps({"instance": str(instancedir), "created": time.time()})
+        )
+        os.rename(staging, directory / key)
+    except OSError as exc:
+        # Another process may have stored the same snapshot meanwhile.
+        debug(f"Not storing the snapshot {key}: {exc}")
+        rmtree(staging)
+        return
+    info(f"Stored the instance as snapshot {key[:12]}")
+    _prune(directory, int(cfg.mkinstance.snapshots.keep))
+
+
+def _prune(directory, keep):
+    """Remove all but the ``keep`` snapshots used most recently."""
+    snapshots = sorted(
+        (
+            snapshot
+            for snapshot in directory.dirs()
+            if not snapshot.name.startswith(".") and (snapshot / "instance").is_dir()
+        ),
+        key=lambda snapshot: snapshot.stat().st_mtime,
+        reverse=True,
+    )
+    for snapshot in snapshots[keep:]:
+        debug(f"Removing the snapshot {snapshot}")
+        rmtree(snapshot)
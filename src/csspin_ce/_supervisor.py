@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Runs a command detached from spin in its own process group and keeps track of
+it in a registry file, so that later spin invocations can query and stop it.
+
+The registry is a JSON file holding the PID of the process group leader, the
+command line, the log file and further data passed by the caller, like the
+readiness probes of the services started.
+"""
+
+import json
+import os
+import signal
+import subprocess  # nosec: import_subprocess
+import sys
+import time
+from contextlib import suppress
+
+from path import Path
+
+from csspin_ce._utils import write_json
+
+
+def alive(pid):
+    """Whether the process ``pid`` is still running."""
+    if sys.platform == "win32":
+        import ctypes
+
+        synchronize, wait_timeout = 0x00100000, 0x00000102
+        kernel32 = ctypes.windll.kernel32
+        if not (handle := kernel32.OpenProcess(synchronize, False, pid)):
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == wait_timeout
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        # Reap the process, if it has been started by the current one.
+        if os.waitpid(pid, os.WNOHANG)[0] == pid:
+            return False
+    except ChildProcessError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def detached():
+    """
+    The keyword arguments of :py:class:`subprocess.Popen` detaching a process
+    from the current one and its terminal.
+    """
+    if sys.platform == "win32":
+        return {
+            "creationflags": subprocess.CREATE_NEW_PROCESS_GROUP
+            | subprocess.DETACHED_PROCESS
+        }
+    return {"start_new_session": True}
+
+
+def read_registry(registry):
+    """
+    Return the content of ``registry`` if its process is still running,
+    removing a stale registry otherwise.
+    """
+    registry = Path(registry)
+    try:
+        entry = json.loads(registry.read_text())
+    except (OSError, ValueError):
+        return None
+    if not alive(entry["pid"]):
+        registry.remove_p()
+        return None
+    return entry
+
+
+def start(cmd, registry, log, **data):
+    """
+    Start the shell command ``cmd`` detached from the current process and its
+    terminal, writing its output to ``log``. The process is recorded in
+    ``registry`` together with ``data``. Returns the registry's content.
+    """
+    Path(log).dirname().makedirs_p()
+    with open(log, "ab") as output:
+        proc = subprocess.Popen(  # pylint: disable=consider-using-with
+            cmd,
+            shell=True,  # nosec subprocess_popen_with_shell_equals_true
+            stdin=subprocess.DEVNULL,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+            **detached(),
+        )
+    entry = {
+        "pid": proc.pid,
+        "command": cmd,
+        "log": str(log),
+        "started": time.time(),
+        **data,
+    }
+    write_json(Path(registry), entry)
+    return entry
+
+
+def stop(registry, timeout):
+    """
+    Interrupt the process group recorded in ``registry`` like pressing
+    ``Ctrl+C`` would, and kill it if it didn't terminate within ``timeout``
+    seconds. Returns whether a running process has been stopped.
+
+    Processes without a console can't be interrupted on Windows, thus the
+    process tree is killed right away there.
+    """
+    if not (entry := read_registry(registry)):
+        return False
+    pid = entry["pid"]
+    if sys.platform == "win32":
+        subprocess.run(  # nosec: start_process_with_partial_path
+            ["taskkill", "/F", "/T", "/PID", str(pid)],
+            check=False,
+            capture_output=True,
+        )
+    else:
+        with suppress(ProcessLookupError):
+            os.killpg(pid, signal.SIGINT)
+        deadline = time.monotonic() + timeout
+        while alive(pid) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        with suppress(ProcessLookupError):
+            os.killpg(pid, signal.SIGKILL)
+    Path(registry).remove_p()
+    return True
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Timing instrumentation of the provisioning done by the plugins of csspin-ce.
+
+The steps are recorded as spans in the Trace Event Format, which can be viewed
+using chrome://tracing or https://ui.perfetto.dev and is easily processed by
+other tools, e.g. to track the provisioning performance over time. Counters,
+like the number of bytes downloaded, are summed up in all spans open in the
+current thread, including those a worker thread inherited from the thread
+submitting its job, see :py:func:`inherit`.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from path import Path
+
+_EVENTS = []
+_EVENTS_LOCK = threading.Lock()
+_OPEN = threading.local()
+
+
+def _open_spans():
+    if not hasattr(_OPEN, "spans"):
+        _OPEN.spans = []
+    return _OPEN.spans
+
+
+@contextmanager
+def span(name, **args):
+    """
+    Context manager recording the wall time of the step ``name`` along with
+    the arguments ``args``.
+    """
+    event = {
+        "name": name,
+        "cat": "csspin_ce",
+        "ph": "X",
+        "pid": os.getpid(),
+        "tid": threading.get_native_id(),
+        "ts": time.time_ns() // 1000,
+        "args": dict(args),
+    }
+    start = time.perf_counter_ns()
+    spans = _open_spans()
+    spans.append(event)
+    try:
+        yield
+    except BaseException:
+        event["args"]["failed"] = True
+        raise
+    finally:
+        spans.pop()
+        event["dur"] = (time.perf_counter_ns() - start) // 1000
+        with _EVENTS_LOCK:
+            _EVENTS.append(event)
+
+
+def open_spans():
+    """The spans open in the current thread, to be inherited by :py:func:`inherit`."""
+    return list(_open_spans())
+
+
+@contextmanager
+def inherit(parents):
+    """
+    Context manager making the spans ``parents``, that are open in another
+    thread, enclose the spans opened in the current thread, e.g. a worker
+    thread running a job on behalf of that thread.
+    """
+    spans = _open_spans()
+    outer = list(spans)
+    spans[:] = [*parents, *outer]
+    try:
+        yield
+    finally:
+        spans[:] = outer
+
+
+def annotate(**args):
+    """Add ``args`` to the innermost span open in the current thread."""
+    if spans := _open_spans():
+        spans[-1]["args"].update(args)
+
+
+def count(counter, value):
+    """Add ``value`` to ``counter`` of all spans open in the current thread."""
+    # Inherited spans are shared by several threads.
+    with _EVENTS_LOCK:
+        for event in _open_spans():
+            event["args"][counter] = event["args"].get(counter, 0) + value
+
+
+def write_trace(cfg):
+    """
+    Write the spans recorded so far to ``contact_elements.trace``, unless it
+    is empty.
+    """
+    if not (trace_file := cfg.contact_elements.trace):
+        return
+    with _EVENTS_LOCK:
+        events = sorted(_EVENTS, key=lambda event: event["ts"])
+    # Not using _utils.write_json, since _utils records spans itself.
+    trace_file = Path(trace_file)
+    trace_file.dirname().makedirs_p()
+    tmp = trace_file.dirname() / f".{trace_file.basename()}.{uuid.uuid4().hex}"
+    tmp.write_text(
+        json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, indent=2)
+    )
+    os.replace(tmp, trace_file)
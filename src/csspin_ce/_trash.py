@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Removal of directories in the background, e.g. of instances to rebuild.
+
+Removing a large instance takes tens of seconds. Instead, the instance is
+renamed into a trash directory, which is atomic, and the trash directory is
+emptied by a process running detached from spin. Since that process empties
+the whole trash directory, it removes the leftovers of processes that have
+been killed, too.
+"""
+
+import os
+import subprocess  # nosec: import_subprocess
+import sys
+import uuid
+
+from csspin import debug, info, rmtree
+from path import Path
+
+from csspin_ce._supervisor import detached
+
+#: The script emptying the trash directory passed as its argument.
+_EMPTY = """
+import os, shutil, sys
+for name in os.listdir(sys.argv[1]):
+    shutil.rmtree(os.path.join(sys.argv[1], name), ignore_errors=True)
+"""
+
+
+def empty(trash):
+    """Empty the directory ``trash`` in a process running in the background."""
+    if not (trash := Path(trash)).is_dir() or not any(trash.iterdir()):
+        return
+    debug(f"Emptying {trash} in the background")
+    subprocess.Popen(  # pylint: disable=consider-using-with # nosec
+        [sys.executable, "-c", _EMPTY, trash],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **detached(),
+    )
+
+
+def remove(path, trash):
+    """
+    Remove the directory ``path`` by moving it into the directory ``trash``,
+    which is emptied in the background. ``path`` is removed right away if it
+    can't be moved, e.g. since ``trash`` is on another file system.
+    """
+    path, trash = Path(path), Path(trash)
+    trash.makedirs_p()
+    try:
+        os.rename(path, trash / f"{path.basename()}.{uuid.uuid4().hex}")
+    except OSError as exc:
+        debug(f"Can't move {path} into {trash}: {exc}")
+        rmtree(path)
+        return
+    info(f"Removing {path} in the background")
+    empty(trash)
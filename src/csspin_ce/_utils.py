@@ -16,58 +16,244 @@
 # limitations under the License.
 
 """
-Util which provides the extract function while it hasn't been implement into the spin core.
+Util which provides a single-pass, streaming variant of spin's extract
+function, as well as helpers shared by the plugins of csspin-ce.
 """
 
+import hashlib
+import json
+import os
+import shutil
+import sys
 import tarfile
+import threading
+import uuid
 import zipfile
+from contextlib import contextmanager
+from fnmatch import fnmatch
 
 from csspin import (
     die,
     echo,
+    mkdir,
 )
 
-try:
-    from csspin import extract  # pylint: disable=unused-import
-except ImportError:
+from csspin_ce._trace import count, span
 
-    def extract(archive, extract_to, member=""):
-        """Unpacks archives"""
-        echo(f"Extracting {archive} to {extract_to}")
-        member = member.replace("\\", "/")
+#: The ioctl cloning a file on Linux file systems supporting reflinks.
+_FICLONE = 0x40049409
 
-        mode = None
+
+def write_json(path, data, indent=2):
+    """Atomically replace ``path`` by the JSON representation of ``data``."""
+    mkdir(path.dirname())
+    tmp = path.dirname() / f".{path.basename()}.{uuid.uuid4().hex}"
+    tmp.write_text(
+        json.dumps(data, indent=indent, separators=None if indent else (",", ":"))
+    )
+    os.replace(tmp, path)
+
+
+def fingerprint(**parts):
+    """The SHA-256 digest of ``parts``, which doesn't depend on their order."""
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Context manager holding an exclusive advisory lock on the file ``path``,
+    waiting until other processes or threads holding it released it. The
+    lock file itself is kept, since removing it would break the lock for
+    those waiting on it.
+    """
+    mkdir(path.dirname())
+    with open(path, "a+b") as fd:
+        if sys.platform == "win32":
+            import msvcrt
+
+            fd.seek(0)
+            while True:
+                try:
+                    # Gives up after ten attempts in intervals of a second.
+                    msvcrt.locking(fd.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                fd.seek(0)
+                msvcrt.locking(fd.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def is_tar(name):
+    """Whether ``name`` is the name of a (compressed) tar archive."""
+    return str(name).endswith((".tar", ".tar.gz", ".tgz", ".tar.xz"))
+
+
+def extract_stream(fileobj, extract_to, member=""):
+    """
+    Unpacks the members of the tar archive read from ``fileobj`` starting
+    with ``member``.
+
+    The archive is decompressed and unpacked in a single pass while reading
+    it, thus ``fileobj`` doesn't need to be seekable, e.g. a download in
+    progress.
+    """
+    member = str(member).replace("\\", "/")
+    with tarfile.open(fileobj=fileobj, mode="r|*") as arc:
+        for entity in arc:
+            if entity.name.startswith(member):
+                arc.extract(entity, path=extract_to)  # nosec: tarfile_unsafe_members
+                count("bytes_extracted", entity.size)
+
+
+def _extract_zip(archive, extract_to, member="", workers=1):
+    """
+    Unpacks the members of the zip archive starting with ``member`` using
+    ``workers`` threads.
+
+    The members of a zip archive are compressed independently, thus they can
+    be inflated concurrently. Each thread opens the archive on its own, since
+    a ``ZipFile`` serializes all reads from its underlying file.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with zipfile.ZipFile(archive, mode="r") as arc:
+        members = [info for info in arc.infolist() if info.filename.startswith(member)]
+        count("bytes_extracted", sum(info.file_size for info in members))
+        if workers <= 1 or len(members) <= 1:
+            arc.extractall(members=members, path=extract_to)
+            return
+
+    # Create the directories upfront, as ZipFile.extract races when creating
+    # the same parent directory from several threads. Like ZipFile.extract,
+    # leave out the parts that would escape ``extract_to``.
+    for parts in {
+        tuple(
+            part
+            for part in info.filename.split("/")[:-1]
+            if part not in ("", os.curdir, os.pardir)
+        )
+        for info in members
+    }:
+        os.makedirs(os.path.join(extract_to, *parts), exist_ok=True)
+
+    local = threading.local()
+    opened = []
+
+    def _extract_member(info):
+        if not hasattr(local, "arc"):
+            # Closed once all members are unpacked.
+            local.arc = zipfile.ZipFile(  # pylint: disable=consider-using-with
+                archive, mode="r"
+            )
+            opened.append(local.arc)
+        local.arc.extract(info, path=extract_to)
+
+    # Inflate the largest members first, to keep all threads busy.
+    members.sort(key=lambda info: info.file_size, reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(_extract_member, members):
+                pass
+    finally:
+        for arc in opened:
+            arc.close()
+
+
+def extract(archive, extract_to, member="", workers=1):
+    """
+    Unpacks archives. The members of zip archives are unpacked by ``workers``
+    threads concurrently.
+    """
+    echo(f"Extracting {archive} to {extract_to}")
+    member = str(member).replace("\\", "/")
+
+    with span("extract", archive=str(archive)):
         if tarfile.is_tarfile(archive):
-            extractor = tarfile.open
-            if archive.endswith(".tar.gz") or archive.endswith(".tgz"):
-                mode = "r:gz"
-            elif archive.endswith(".tar.xz"):
-                mode = "r:xz"
+            with open(archive, "rb") as fileobj:
+                extract_stream(fileobj, extract_to, member)
         elif zipfile.is_zipfile(archive):
-            extractor = zipfile.ZipFile
-            mode = "r"
-        if not mode:
+            _extract_zip(archive, extract_to, member, workers)
+        else:
             die(f"Unsupported archive type {archive}")
 
-        with extractor(  # pylint: disable=possibly-used-before-assignment
-            archive, mode=mode  # pylint: disable=possibly-used-before-assignment
-        ) as arc:
-            if isinstance(arc, tarfile.TarFile):
-                members = (
-                    entity
-                    for entity in arc.getmembers()  # pylint: disable=maybe-no-member
-                    if entity.name.startswith(member)
-                )
-            elif isinstance(arc, zipfile.ZipFile):
-                members = (
-                    entity
-                    for entity in arc.namelist()  # pylint: disable=maybe-no-member
-                    if entity.startswith(member)
-                )
+
+def matches(path, patterns):
+    """Whether a component of the relative ``path`` matches one of ``patterns``."""
+    return any(
+        fnmatch(part, pattern)
+        for part in os.path.normpath(path).split(os.sep)
+        for pattern in patterns
+    )
+
+
+def _reflink(source, target):
+    """
+    Clone ``source`` to ``target`` sharing their data blocks until either one
+    is modified. Returns whether the file system supports it.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            cloned = False
+        else:
+            cloned = True
+    if not cloned:
+        os.remove(target)
+        return False
+    shutil.copystat(source, target)
+    return True
+
+
+def clone_tree(source, target, mutable=(), hardlinks=True):
+    """
+    Copy the directory ``source`` to ``target`` without copying the files'
+    data where possible: files are cloned by reflinks if the file system
+    supports them, otherwise hard-linked. Files with a path component
+    matching one of the glob patterns in ``mutable`` are never hard-linked,
+    but copied, since all other files must not be modified in place in
+    either tree. Unless ``hardlinks`` is set, no file is hard-linked at all.
+    Returns the number of files cloned, linked and copied.
+    """
+    counts = {"cloned": 0, "linked": 0, "copied": 0}
+    reflinks = True
+
+    def clone_file(src, dst):
+        nonlocal reflinks
+        if reflinks and _reflink(src, dst):
+            counts["cloned"] += 1
+            return dst
+        # Don't try again, once the file system doesn't support reflinks.
+        reflinks = False
+        if hardlinks and not matches(os.path.relpath(src, source), mutable):
+            try:
+                os.link(src, dst)
+            except OSError:
+                pass
             else:
-                members = ()
+                counts["linked"] += 1
+                return dst
+        counts["copied"] += 1
+        return shutil.copy2(src, dst)
 
-            arc.extractall(
-                members=members,
-                path=extract_to,
-            )  # nosec: tarfile_unsafe_members
+    with span("clone_tree", source=str(source)):
+        shutil.copytree(source, target, symlinks=True, copy_function=clone_file)
+    return counts
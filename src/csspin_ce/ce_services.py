@@ -22,20 +22,28 @@ Provides a wrapper around the CLI tool of ce_services and
 provisions all tool necessary for these ce_services.
 """
 
+import hashlib
+import json
 import os
+import platform
 import shutil
 import sys
+import tarfile
+import threading
+import time
+from contextlib import nullcontext
+from functools import partial
 from tempfile import TemporaryDirectory
-from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
 
 from csspin import (
     Verbosity,
-    cd,
     config,
     debug,
     die,
-    download,
+    echo,
     exists,
+    info,
     interpolate1,
     mkdir,
     mv,
@@ -48,13 +56,21 @@ from csspin import (
 )
 from path import Path
 
-from csspin_ce._utils import extract
+from csspin_ce._environment import cached_environment, invalidate_environment
+
+#: The configuration file of ce_services within the etcd directory of the
+#: instance.
+_SERVICE_CONFIG = "spin_ce_services_config.json"
+
+#: Seconds to wait for detached services to terminate before killing them.
+_STOP_TIMEOUT = 30
 
 defaults = config(
     hivemq=config(
         enabled=False,
         install_dir="{spin.data}/hivemq",
         version="2024.4",
+        probe="tcp://localhost:1883",
         elements_integration=config(
             user="csiot_integrator",
             password="",  # nosec: hardcoded_password_funcarg
@@ -65,11 +81,13 @@ defaults = config(
         enabled=False,
         version="1.8.10",
         install_dir="{spin.data}/influxdb",
+        probe="http://localhost:8086/ping",
     ),
     traefik=config(
         version="2.11.2",
         dashboard_port="",
         install_dir="{spin.data}/traefik",
+        probe="http://localhost:8080/",
         tls=config(
             enabled=False,
         ),
@@ -78,6 +96,7 @@ defaults = config(
         version="",
         install_dir="{spin.data}/solr",
         version_postfix="-slim",
+        probe="http://localhost:8983/solr/admin/info/system",
         mirrors=["https://downloads.apache.org/", "https://archive.apache.org/dist/"],
     ),
     rabbitmq=config(
@@ -87,23 +106,39 @@ defaults = config(
         erlang=config(
             version="28.0",
             install_dir="{spin.data}/erlang",
+            build_cache=True,
         ),
+        probe="tcp://localhost:5672",
     ),
     redis=config(
         version="8.4.0",
         install_dir="{spin.data}/redis",
+        probe="redis://localhost:6379",
     ),
     tika=config(
         version="3.2.3",
         install_dir="{spin.data}/tika",
+        probe="http://localhost:9998/tika",
         mirrors=["https://downloads.apache.org/", "https://archive.apache.org/dist/"],
     ),
     loglevel="",
+    profile="",
+    jobs=4,
+    readiness=config(timeout=300),
+    ports=config(
+        dynamic=False,
+        registry="{spin.data}/csspin_ce/ports.json",
+    ),
+    sampler=config(
+        enabled=False,
+        interval=1,
+        capacity=3600,
+        file="{spin.spin_dir}/csspin_ce/ce_services_usage.json",
+    ),
     requires=config(
         spin=["csspin_ce.contact_elements", "csspin_ce.mkinstance", "csspin_java.java"],
         python=[
             "ce_services>=1.5.0",
-            "psutil",
             "requests",
         ],
     ),
@@ -173,9 +208,30 @@ def ce_services(
         "--instance",  # noqa: F821
         help="Directory of the CONTACT Elements instance.",  # noqa: F722
     ),
+    detach: option(
+        "--detach",  # noqa: F821
+        is_flag=True,
+        help="Start the services in the background.",  # noqa: F722
+    ),
+    wait_ready: option(
+        "--wait-ready",  # noqa: F821
+        is_flag=True,
+        help="Wait until the started services are ready.",  # noqa: F722
+    ),
     args,
 ):
-    """Start the CE services synchronously."""
+    """
+    Start the CE services synchronously, reporting the time it took until
+    each service accepts connections.
+
+    Using --detach, the services are started in the background, unless they
+    are running for the instance already, and can be reused by later
+    commands. 'spin ce-services status' and 'spin ce-services stop' show and
+    stop them. Using --wait-ready, the task returns as soon as the services
+    are ready, without starting them if --detach isn't passed.
+    """
+    # pylint: disable=too-many-locals
+    from csspin_ce import _readiness, _supervisor
 
     if not Path(os.getenv("CADDOK_BASE", "")).is_dir() and not (
         instance and Path(instance).is_dir()
@@ -184,6 +240,100 @@ def ce_services(
     if instance:
         setenv(CADDOK_BASE=instance)
 
+    registry = Path(os.environ["CADDOK_BASE"]) / "tmp" / "spin_ce_services.json"
+    if args[:1] == ("status",):
+        _status(registry)
+        return
+    if args[:1] == ("stop",):
+        _stop(registry)
+        return
+
+    timeout = int(cfg.ce_services.readiness.timeout)
+    _apply_profile(cfg)
+    running = _supervisor.read_registry(registry)
+    probes = _probes(
+        cfg, _ports(cfg, allocate=not running and (detach or not wait_ready))
+    )
+    if detach:
+        if running:
+            info(f"Reusing ce_services running detached (PID {running['pid']})")
+        else:
+            running = _start_detached(cfg, args, registry, probes)
+    elif running and not wait_ready:
+        die(
+            f"ce_services is running detached already (PID {running['pid']}),"
+            " use 'spin ce-services stop' to stop it."
+        )
+    if detach or wait_ready:
+        probes = running["probes"] if running else probes
+        if wait_ready and not _report_readiness(
+            _readiness.wait_until_ready(probes, timeout), timeout
+        ):
+            die("Not all services are ready.")
+        return
+
+    stop = threading.Event()
+    sampler = None
+
+    def report():
+        ready = _readiness.wait_until_ready(probes, timeout, stop)
+        # Don't report the services once ce_services terminated.
+        if not stop.is_set():
+            _report_readiness(ready, timeout)
+
+    cmd = _command(cfg, args)
+    prober = threading.Thread(target=report, daemon=True)
+    prober.start()
+    try:
+        # Use shell=True so that signals like SIGINT after pressing CTRL+C are
+        # being propagated properly and the gatekepper with its workers don't
+        # keep hanging.
+        with _sampler(cfg) as sampler:
+            sh(cmd, shell=True)  # nosec any_other_function_with_shell_equals_true
+    finally:
+        stop.set()
+        prober.join()
+        if sampler:
+            _report_usage(sampler)
+
+
+def _sampler(cfg):
+    """
+    The sampler of the services' resource usage, if enabled and psutil is
+    available in spin's environment.
+    """
+    from csspin_ce._sampler import Sampler
+
+    if not cfg.ce_services.sampler.enabled:
+        return nullcontext()
+    try:
+        import psutil
+    except ImportError:
+        warn("Can't sample the resource usage of the services without psutil.")
+        return nullcontext()
+    return Sampler(
+        psutil,
+        os.getpid(),
+        interpolate1(cfg.ce_services.sampler.file),
+        interval=float(cfg.ce_services.sampler.interval),
+        capacity=int(cfg.ce_services.sampler.capacity),
+    )
+
+
+def _report_usage(sampler):
+    """Report the peak resource usage of each service."""
+    for service, usage in sorted(sampler.summary().items()):
+        info(
+            f"{service}: max. {usage['max_rss'] / 2**20:.0f} MiB RSS,"
+            f" {usage['max_cpu_percent']:.0f}% CPU (mean"
+            f" {usage['mean_cpu_percent']:.0f}%), {usage['max_fds']} fds,"
+            f" {usage['max_threads']} threads"
+        )
+    info(f"Resource usage of the services written to {sampler.file}")
+
+
+def _command(cfg, args):
+    """The command line to run ce_services with, setting up its environment."""
     # Now set the relevant CLI options from cfg, making sure to only add those
     # from cfg that haven't already been set by the CLI.
     all_cli_args = list(args)
@@ -207,327 +357,631 @@ def ce_services(
     elif cfg.verbosity == Verbosity.DEBUG:
         all_cli_args.append("-vv")
 
-    # Use shell=True so that signals like SIGINT after pressing CTRL+C are being
-    # propagated properly and the gatekepper with its workers don't keep
-    # hanging.
-    cmd = " ".join(["ce_services", *all_cli_args])
-    setenv(CADDOK_SERVICE_CONFIG="{CADDOK_BASE}/etcd/spin_ce_services_config.json")
-    sh(cmd, shell=True)  # nosec any_other_function_with_shell_equals_true
+    setenv(CADDOK_SERVICE_CONFIG=f"{{CADDOK_BASE}}/etcd/{_SERVICE_CONFIG}")
+    return " ".join(["ce_services", *all_cli_args])
 
 
-def provision(cfg):  # pylint: disable=too-many-statements
-    """
-    Provision tools necessary to startup all ce_services.
+def _start_detached(cfg, args, registry, probes):
+    """Start ce_services in the background and record it in ``registry``."""
+    from csspin_ce import _supervisor
+
+    cmd = _command(cfg, args)
+    log = registry.dirname() / "spin_ce_services.log"
+    echo(cmd)
+    with cfg.spin.subprocess_environment():
+        running = _supervisor.start(cmd, registry, log, probes=probes)
+    info(f"Started ce_services detached (PID {running['pid']}), logging to {log}")
+    return running
+
+
+def _stop(registry):
+    """Stop ce_services running detached."""
+    from csspin_ce import _supervisor
+
+    if _supervisor.stop(registry, _STOP_TIMEOUT):
+        info("Stopped the detached ce_services")
+    else:
+        info("ce_services is not running detached")
 
-    FIXME: This function is too long and should be split into smaller functions.
+
+def _status(registry):
+    """Report whether ce_services runs detached and which services are ready."""
+    from csspin_ce import _supervisor
+    from csspin_ce._readiness import probe
+
+    if not (running := _supervisor.read_registry(registry)):
+        info("ce_services is not running detached")
+        return
+    uptime = time.time() - running["started"]
+    info(
+        f"ce_services is running detached (PID {running['pid']}) since"
+        f" {uptime:.0f}s, logging to {running['log']}"
+    )
+    for name, url in running["probes"].items():
+        info(f"{name}: {'ready' if probe(url) else 'not ready'} ({url})")
+
+
+def _services(cfg):
+    """The names of the services started by ce_services."""
+    services = {
+        "traefik": True,
+        "solr": True,
+        "redis": True,
+        "tika": cfg.contact_elements.umbrella not in ("16.0", "2026.1"),
+        "hivemq": cfg.ce_services.hivemq.enabled,
+        "influxdb": cfg.ce_services.influxdb.enabled,
+        "rabbitmq": cfg.ce_services.rabbitmq.enabled,
+    }
+    return [name for name, enabled in services.items() if enabled]
+
+
+def _ports(cfg, allocate):
+    """
+    The ports of the services, if ``ce_services.ports.dynamic`` is set. Free
+    ports are allocated and written into the service configuration of the
+    instance if ``allocate`` is set, otherwise they are read from it.
     """
+    from csspin_ce._ports import allocate_ports
+    from csspin_ce._utils import write_json
+
+    if not cfg.ce_services.ports.dynamic:
+        return {}
+    service_config = Path(os.environ["CADDOK_BASE"]) / "etcd" / _SERVICE_CONFIG
+    try:
+        settings = json.loads(service_config.read_text())
+    except (OSError, ValueError):
+        settings = {}
+    services = [*_services(cfg), "traefik_dashboard"]
+    if not allocate:
+        return {
+            service: settings[f"{service}_port"]
+            for service in services
+            if f"{service}_port" in settings
+        }
 
-    def install_traefik(cfg):
-        version = cfg.ce_services.traefik.version
-        traefik_install_dir = cfg.ce_services.traefik.install_dir / version
+    ports = allocate_ports(
+        interpolate1(cfg.ce_services.ports.registry),
+        Path(os.environ["CADDOK_BASE"]).realpath(),
+        services,
+    )
+    settings |= {f"{service}_port": port for service, port in ports.items()}
+    write_json(service_config, settings)
+    info(
+        "Using the ports "
+        + ", ".join(f"{service}={port}" for service, port in ports.items())
+    )
+    return ports
 
-        traefik = traefik_install_dir / f"traefik{cfg.platform.exe}"
 
-        if not traefik.exists():
-            debug("Installing Traefik")
-            mkdir(traefik_install_dir)
+def _probes(cfg, ports):
+    """
+    The readiness probes of the enabled services, by the services' names,
+    probing the ports in ``ports`` instead of the configured ones.
+    """
+    from csspin_ce._readiness import SCHEMES
 
-            archive = (
-                f"traefik_v{version}_windows_amd64.zip"
-                if sys.platform == "win32"
-                else f"traefik_v{version}_linux_amd64.tar.gz"
-            )
+    probes = {
+        name: interpolate1(cfg.ce_services[name].probe)
+        for name in _services(cfg)
+        if cfg.ce_services[name].probe
+    }
+    for name, port in ports.items():
+        if name in probes:
+            parts = urlsplit(probes[name])
+            probes[name] = parts._replace(netloc=f"{parts.hostname}:{port}").geturl()
+    for name, url in probes.items():
+        if urlsplit(url).scheme not in SCHEMES:
+            die(f"Unsupported readiness probe for {name}: {url}")
+    return probes
 
-            with TemporaryDirectory() as tmp_dir:
-                archive_path = Path(tmp_dir) / archive
-                download(
-                    f"https://github.com/traefik/traefik/releases/download/v{version}/{archive}",
-                    archive_path,
-                )
-                extract(archive_path, traefik_install_dir, f"traefik{cfg.platform.exe}")
+
+def _apply_profile(cfg):
+    """
+    Size the JVMs of Apache Solr and HiveMQ according to ``ce_services.profile``
+    by setting the environment variables their start scripts evaluate, unless
+    they are set already.
+    """
+    from csspin_ce import _profile
+
+    if not (profile := cfg.ce_services.profile):
+        return
+    if profile not in _profile.PROFILES:
+        die(
+            f"Unknown ce_services.profile '{profile}', use one of"
+            f" {', '.join(_profile.PROFILES)}."
+        )
+    settings = _profile.jvm_settings(
+        profile, _services(cfg), _profile.host_memory(), _profile.host_processors()
+    )
+    variables = {}
+    if solr := settings.get("solr"):
+        variables |= {
+            "SOLR_HEAP": f"{solr['heap']}m",
+            "GC_TUNE": solr["gc"],
+            "SOLR_OPTS": f"-XX:ActiveProcessorCount={solr['processors']}",
+        }
+    if hivemq := settings.get("hivemq"):
+        variables["JAVA_OPTS"] = _profile.jvm_options(hivemq)
+    for name, value in variables.items():
+        if name in os.environ:
+            debug(f"Keeping {name}={os.environ[name]}")
         else:
-            debug(f"Using cached traefik ({traefik})")
-
-    def install_solr(cfg):
-        version = cfg.ce_services.solr.version
-        install_dir = cfg.ce_services.solr.install_dir
-        postfix = cfg.ce_services.solr.version_postfix
-
-        solr_name = Path(f"solr-{version}{postfix}")
-        solr_path = install_dir / solr_name
-
-        if not solr_path.exists():
-            debug("Installing Apache Solr")
-            mkdir(install_dir)
-            archive = f"{solr_name}.tgz"
-
-            with TemporaryDirectory() as tmp_dir:
-                archive_path = Path(tmp_dir) / archive
-                url_path = f"solr/solr/{version}/{archive}"
-                for mirror in cfg.ce_services.solr.mirrors:
-                    if mirror[-1] == "/":
-                        url = f"{mirror}{url_path}"
-                    else:
-                        url = f"{mirror}/{url_path}"
-                    try:
-                        download(url, archive_path)
-                        break
-                    except HTTPError:
-                        warn(f"Solr {version} not found at {url}")
-                        continue
-                    except URLError:
-                        warn(f"{mirror} currently not reachable")
-                        continue
-                else:
-                    die(  # pylint: disable=broad-exception-raised
-                        "Could not download Apache Solr from any of the mirrors."
-                    )
+            setenv(**{name: value})
+    for service, values in settings.items():
+        info(
+            f"Sizing {service} for profile '{profile}': {values['heap']} MiB heap,"
+            f" {values['processors']} processors"
+        )
 
-                extract(archive_path, install_dir, solr_name)
+
+def _report_readiness(ready, timeout):
+    """Report the time-to-ready of each service, returns whether all are ready."""
+    for name, seconds in ready.items():
+        if seconds is None:
+            warn(f"{name} is not ready after {timeout}s")
         else:
-            debug(f"Using cached Apache Solr ({solr_path})")
+            info(f"{name} is ready after {seconds:.2f}s")
+    return all(seconds is not None for seconds in ready.values())
 
-    def install_redis(cfg):
-        if sys.platform == "win32":
-            redis_install_dir = (
-                cfg.ce_services.redis.install_dir / cfg.ce_services.redis.version
-            )
-            redis = redis_install_dir / "redis-server.exe"
-            if not redis.exists():
-                mkdir(cfg.ce_services.redis.install_dir)
-                debug("Installing redis-server")
-                with TemporaryDirectory() as tmp_dir:
-                    redis_installer_archive = (
-                        Path(tmp_dir)
-                        / f"redis-windows-{cfg.ce_services.redis.version}.zip"
-                    )
-                    download(
-                        "https://github.com/redis-windows/redis-windows/releases/download/"
-                        f"{cfg.ce_services.redis.version}/"
-                        f"Redis-{cfg.ce_services.redis.version}-Windows-x64-msys2.zip",
-                        redis_installer_archive,
-                    )
-                    extract(redis_installer_archive, cfg.ce_services.redis.install_dir)
-                    (
-                        cfg.ce_services.redis.install_dir
-                        / f"Redis-{cfg.ce_services.redis.version}-Windows-x64-msys2"
-                    ).rename(
-                        redis_install_dir
-                    )  # FIXME: Why not using spin.mv?
-            else:
-                debug(f"Using cached redis-server ({redis})")
 
-        elif not shutil.which("redis-server"):
-            die(
-                "Cannot provision redis-server on linux. Please run 'spin system-provision'."  # noqa: E501
-            )
+def _traefik_url(cfg):
+    version = cfg.ce_services.traefik.version
+    archive = (
+        f"traefik_v{version}_windows_amd64.zip"
+        if sys.platform == "win32"
+        else f"traefik_v{version}_linux_amd64.tar.gz"
+    )
+    return f"https://github.com/traefik/traefik/releases/download/v{version}/{archive}"
 
-    def install_hivemq(cfg):
-        def _download(
-            url,
-            zipfile_name,
-            target_directory,
-            ignore,
-            unpacked_source_directory,
-        ):
-            """
-            Downloads the zip from provided URL and moves the desired content
-            into the target directory.
-            """
-            if exists(target_directory):
-                rmtree(target_directory)
-            mkdir(target_directory)
-
-            with TemporaryDirectory() as tmp_dir:
-                download(
-                    url=url,
-                    location=(download_file := Path(tmp_dir) / zipfile_name),
-                )
-                extract(download_file, tmp_dir)
 
-                for f in os.listdir(
-                    (
-                        unpacked_source_directory := Path(tmp_dir)
-                        / unpacked_source_directory
-                    )
-                ):
-                    if f not in ignore:
-                        # FIXME: Why not using spin.mv?
-                        debug(
-                            "Moving"
-                            f" {(source := str(unpacked_source_directory / f))}"
-                            f" -> {(target := str(target_directory))}"
-                        )
-                        shutil.move(source, target)
-
-        hivemq_version = cfg.ce_services.hivemq.version
-        hivemq_base_dir = cfg.ce_services.hivemq.install_dir / hivemq_version
-        if exists(hivemq_base_dir):
-            debug(f"Using cached HiveMQ ({hivemq_base_dir})")
-        else:
-            debug(f"Installing HiveMQ {hivemq_version}")
-            hivemq_zipfile = f"hivemq-ce-{hivemq_version}.zip"
-            _download(
-                url="https://github.com/hivemq/hivemq-community-edition/releases"
-                f"/download/{hivemq_version}/{hivemq_zipfile}",
-                zipfile_name=hivemq_zipfile,
-                unpacked_source_directory=f"hivemq-ce-{hivemq_version}",
-                target_directory=hivemq_base_dir,
-                ignore={"data", "log", hivemq_zipfile},
-            )
-            if sys.platform != "win32":
-                from stat import S_IEXEC
+def _solr_urls(cfg):
+    from csspin_ce._cache import mirror_urls
+
+    version = cfg.ce_services.solr.version
+    return mirror_urls(
+        cfg.ce_services.solr.mirrors,
+        f"solr/solr/{version}/solr-{version}{cfg.ce_services.solr.version_postfix}.tgz",
+    )
+
+
+def _redis_url(cfg):
+    version = cfg.ce_services.redis.version
+    return (
+        "https://github.com/redis-windows/redis-windows/releases/download/"
+        f"{version}/Redis-{version}-Windows-x64-msys2.zip"
+    )
+
+
+def _hivemq_url(cfg):
+    version = cfg.ce_services.hivemq.version
+    return (
+        "https://github.com/hivemq/hivemq-community-edition/releases"
+        f"/download/{version}/hivemq-ce-{version}.zip"
+    )
+
+
+def _influxdb_url(cfg):
+    version = cfg.ce_services.influxdb.version
+    archive = (
+        f"influxdb-{version}_windows_amd64.zip"
+        if sys.platform == "win32"
+        else f"influxdb-{version}_linux_amd64.tar.gz"
+    )
+    return f"https://dl.influxdata.com/influxdb/releases/{archive}"
+
+
+def _rabbitmq_url(cfg):
+    version = cfg.ce_services.rabbitmq.version
+    if sys.platform == "win32":
+        archive = f"rabbitmq-server-windows-{version}.zip"
+    else:
+        archive = f"rabbitmq-server-generic-unix-{version}.tar.xz"
+    return (
+        "https://github.com/rabbitmq/rabbitmq-server/releases/download"
+        f"/v{version}/{archive}"
+    )
+
+
+def _erlang_url(cfg):
+    version = cfg.ce_services.rabbitmq.erlang.version
+    base_url = f"https://github.com/erlang/otp/releases/download/OTP-{version}"
+    if sys.platform == "win32":
+        return f"{base_url}/otp_win64_{version}.zip"
+    return f"{base_url}/otp_src_{version}.tar.gz"
+
+
+def _tika_urls(cfg):
+    from csspin_ce._cache import mirror_urls
+
+    version = cfg.ce_services.tika.version
+    return mirror_urls(
+        cfg.ce_services.tika.mirrors,
+        f"tika/{version}/tika-server-standard-{version}.jar",
+    )
+
+
+def _install_traefik(cfg, manifest):
+    """Install the Traefik binary."""
+    from csspin_ce._cache import fetch
+
+    version = cfg.ce_services.traefik.version
+    traefik_install_dir = cfg.ce_services.traefik.install_dir / version
+
+    traefik = traefik_install_dir / f"traefik{cfg.platform.exe}"
+
+    def build(target):
+        debug("Installing Traefik")
+        url = _traefik_url(cfg)
+        return url, fetch(
+            cfg, url, extract_to=target, member=f"traefik{cfg.platform.exe}"
+        )
+
+    if not manifest.install("traefik", version, traefik_install_dir, build):
+        debug(f"Using cached traefik ({traefik})")
+
+
+def _install_solr(cfg, manifest):
+    """Install Apache Solr from the first mirror providing it."""
+    from csspin_ce._cache import fetch_first
+
+    version = cfg.ce_services.solr.version
+    install_dir = cfg.ce_services.solr.install_dir
+    postfix = cfg.ce_services.solr.version_postfix
+
+    solr_name = Path(f"solr-{version}{postfix}")
+    solr_path = install_dir / solr_name
+
+    def build(target):
+        debug("Installing Apache Solr")
+        return fetch_first(
+            cfg,
+            _solr_urls(cfg),
+            f"Apache Solr {version}",
+            extract_to=target.dirname(),
+            member=solr_name,
+        )
+
+    if not manifest.install("solr", version, solr_path, build):
+        debug(f"Using cached Apache Solr ({solr_path})")
+
+
+def _install_redis(cfg, manifest):
+    """Install redis-server on Windows, expect it on the system otherwise."""
+    from csspin_ce._cache import fetch
+
+    if sys.platform == "win32":
+        version = cfg.ce_services.redis.version
+        redis_install_dir = cfg.ce_services.redis.install_dir / version
+        redis = redis_install_dir / "redis-server.exe"
+
+        def build(target):
+            debug("Installing redis-server")
+            url = _redis_url(cfg)
+            archive_path = fetch(cfg, url, extract_to=target.dirname())
+            (target.dirname() / f"Redis-{version}-Windows-x64-msys2").rename(
+                target
+            )  # FIXME: Why not using spin.mv?
+            return url, archive_path
+
+        if not manifest.install("redis", version, redis_install_dir, build):
+            debug(f"Using cached redis-server ({redis})")
+
+    elif not shutil.which("redis-server"):
+        die(
+            "Cannot provision redis-server on linux. Please run 'spin system-provision'."  # noqa: E501
+        )
+
+
+def _install_hivemq(cfg, manifest):
+    """Install the HiveMQ Community Edition."""
+    from csspin_ce._cache import fetch
+
+    def _download(
+        url,
+        target_directory,
+        ignore,
+        unpacked_source_directory,
+    ):
+        """
+        Downloads the zip from provided URL and moves the desired content
+        into the target directory.
+        """
+        mkdir(target_directory)
+
+        with TemporaryDirectory() as tmp_dir:
+            archive_path = fetch(cfg, url, extract_to=tmp_dir)
 
-                for f in ("run.sh", "diagnostics.sh"):
-                    os.chmod(
-                        (f := hivemq_base_dir / "bin" / f),
-                        os.stat(f).st_mode | S_IEXEC,
+            for f in os.listdir(
+                (unpacked_source_directory := Path(tmp_dir) / unpacked_source_directory)
+            ):
+                if f not in ignore:
+                    # FIXME: Why not using spin.mv?
+                    debug(
+                        "Moving"
+                        f" {(source := str(unpacked_source_directory / f))}"
+                        f" -> {(target := str(target_directory))}"
                     )
-                for f in os.listdir((path := hivemq_base_dir / "bin" / "init-script")):
-                    os.chmod((f := path / f), os.stat(f).st_mode | S_IEXEC)
-
-            rmtree(hivemq_base_dir / "extensions" / "hivemq-allow-all-extension")
-
-    def install_influxdb(cfg):
-        version = cfg.ce_services.influxdb.version
-        if not (
-            influxdb_dir := cfg.ce_services.influxdb.install_dir / version
-        ).exists():
-            mkdir(influxdb_dir)
-            debug(f"Installing InfluxDB {version}")
-            archive = (
-                f"influxdb-{version}_windows_amd64.zip"
-                if sys.platform == "win32"
-                else f"influxdb-{version}_linux_amd64.tar.gz"
-            )
+                    shutil.move(source, target)
+        return archive_path
+
+    hivemq_version = cfg.ce_services.hivemq.version
+    hivemq_base_dir = cfg.ce_services.hivemq.install_dir / hivemq_version
+
+    def build(target):
+        debug(f"Installing HiveMQ {hivemq_version}")
+        url = _hivemq_url(cfg)
+        archive_path = _download(
+            url=url,
+            unpacked_source_directory=f"hivemq-ce-{hivemq_version}",
+            target_directory=target,
+            ignore={"data", "log", f"hivemq-ce-{hivemq_version}.zip"},
+        )
+        if sys.platform != "win32":
+            from stat import S_IEXEC
 
-            with TemporaryDirectory() as tmp_dir:
-                download(
-                    f"https://dl.influxdata.com/influxdb/releases/{archive}",
-                    (archive_path := Path(tmp_dir) / archive),
+            for f in ("run.sh", "diagnostics.sh"):
+                os.chmod(
+                    (f := target / "bin" / f),
+                    os.stat(f).st_mode | S_IEXEC,
                 )
-                extract(archive_path, tmp_dir)
-
-                if (
-                    sources := Path(tmp_dir) / f"influxdb-{version}-1"
-                ) and sys.platform == "win32":
-                    for f in os.listdir(sources):
-                        debug(
-                            "Moving" f" {(source := sources / f)}" f" -> {influxdb_dir}"
-                        )
-                        shutil.move(source, influxdb_dir)
-                else:
-                    from stat import S_IEXEC
-
-                    for f in os.listdir((sources := sources / "usr" / "bin")):
-                        # FIXME: Why not using spin.mv?
-                        debug("Moving" f" {(source := sources / f)} -> {influxdb_dir}")
-                        shutil.move(source, influxdb_dir)
-                        os.chmod((f := influxdb_dir / f), os.stat(f).st_mode | S_IEXEC)
-        else:
-            debug(f"Using cached InfluxDB ({influxdb_dir})")
+            for f in os.listdir((path := target / "bin" / "init-script")):
+                os.chmod((f := path / f), os.stat(f).st_mode | S_IEXEC)
 
-    def install_rabbitmq(cfg):
-        """Install RabbitMQ server from GitHub."""
-        version = str(cfg.ce_services.rabbitmq.version)
-        rabbitmq_install_dir = Path(cfg.ce_services.rabbitmq.install_dir)
+        rmtree(target / "extensions" / "hivemq-allow-all-extension")
+        return url, archive_path
 
-        if not (rabbitmq_install_dir / version).exists():
-            debug("Installing RabbitMQ")
-            mkdir(rabbitmq_install_dir)
+    if not manifest.install("hivemq", hivemq_version, hivemq_base_dir, build):
+        debug(f"Using cached HiveMQ ({hivemq_base_dir})")
 
-            rabbitmq_name = f"rabbitmq_server-{version}"
-            base_url = "https://github.com/rabbitmq/rabbitmq-server/releases/download"
-            if sys.platform == "win32":
-                archive = f"rabbitmq-server-windows-{version}.zip"
-            else:
-                archive = f"rabbitmq-server-generic-unix-{version}.tar.xz"
 
-            with TemporaryDirectory() as tmp_dir:
-                download(
-                    f"{base_url}/v{version}/{archive}",
-                    (archive_path := Path(tmp_dir) / archive),
-                )
-                extract(archive_path, rabbitmq_install_dir, rabbitmq_name)
-            mv(rabbitmq_install_dir / rabbitmq_name, rabbitmq_install_dir / version)
+def _install_influxdb(cfg, manifest):
+    """Install the InfluxDB binaries."""
+    from csspin_ce._cache import fetch
 
-        else:
-            debug(f"Using cached rabbitmq-server ({rabbitmq_install_dir / version})")
-
-    def install_erlang(cfg):
-        """Installation of the Erlang programming language"""
-        version = str(cfg.ce_services.rabbitmq.erlang.version)
-        erlang_install_dir = Path(cfg.ce_services.rabbitmq.erlang.install_dir)
-
-        if not (erlang_install_dir / version).exists():
-            debug(f"Installing Erlang {version}")
-            mkdir(erlang_install_dir)
-            base_url = f"https://github.com/erlang/otp/releases/download/OTP-{version}"
-            if sys.platform == "win32":
-                erlang_name = f"otp_win64_{version}"
-                file_extension = ".zip"
+    version = cfg.ce_services.influxdb.version
+    influxdb_dir = cfg.ce_services.influxdb.install_dir / version
+
+    def build(target):
+        mkdir(target)
+        debug(f"Installing InfluxDB {version}")
+        url = _influxdb_url(cfg)
+        with TemporaryDirectory() as tmp_dir:
+            archive_path = fetch(cfg, url, extract_to=tmp_dir)
+
+            if (
+                sources := Path(tmp_dir) / f"influxdb-{version}-1"
+            ) and sys.platform == "win32":
+                for f in os.listdir(sources):
+                    debug("Moving" f" {(source := sources / f)}" f" -> {target}")
+                    shutil.move(source, target)
             else:
-                erlang_name = f"otp_src_{version}"
-                file_extension = ".tar.gz"
-
-            with TemporaryDirectory() as tmp_dir:
-                tmp_path = Path(tmp_dir)
-                archive = erlang_name + file_extension
-                archive_path = tmp_path / archive
-                download(f"{base_url}/{archive}", archive_path)
-
-                if sys.platform == "win32":
-                    extract(archive_path, erlang_install_dir / version)
-                else:
-                    extract(archive_path, tmp_dir, erlang_name)
-                    debug(f"Compiling Erlang {version}")
-                    with cd(tmp_path / erlang_name):
-
-                        from subprocess import DEVNULL  # noqa: F401 # nosec
-
-                        stdout = DEVNULL if cfg.verbosity <= Verbosity.NORMAL else None
-                        sh(
-                            "./configure",
-                            f"--prefix={erlang_install_dir / version}",
-                            "--without-wx",  # no wxWidgets support
-                            "--without-odbc",  # no ODBC support
-                            stdout=stdout,
-                        )
-                        sh("make", stdout=stdout)
-                        sh("make", "install", stdout=stdout)
-
-    def install_tika(cfg):
-        debug(f"Installing apache tika {cfg.ce_services.tika.version}")
-        tika_path = (
-            cfg.ce_services.tika.install_dir
-            / f"tika-server-standard-{cfg.ce_services.tika.version}.jar"
+                from stat import S_IEXEC
+
+                for f in os.listdir((sources := sources / "usr" / "bin")):
+                    # FIXME: Why not using spin.mv?
+                    debug("Moving" f" {(source := sources / f)} -> {target}")
+                    shutil.move(source, target)
+                    os.chmod((f := target / f), os.stat(f).st_mode | S_IEXEC)
+        return url, archive_path
+
+    if not manifest.install("influxdb", version, influxdb_dir, build):
+        debug(f"Using cached InfluxDB ({influxdb_dir})")
+
+
+def _install_rabbitmq(cfg, manifest):
+    """Install RabbitMQ server from GitHub."""
+    from csspin_ce._cache import fetch
+
+    version = str(cfg.ce_services.rabbitmq.version)
+    rabbitmq_install_dir = Path(cfg.ce_services.rabbitmq.install_dir)
+
+    def build(target):
+        debug("Installing RabbitMQ")
+        rabbitmq_name = f"rabbitmq_server-{version}"
+        url = _rabbitmq_url(cfg)
+        archive_path = fetch(
+            cfg, url, extract_to=target.dirname(), member=rabbitmq_name
         )
-        if exists(tika_path):
-            return
-
-        mkdir(cfg.ce_services.tika.install_dir)
-        url_path = f"tika/{cfg.ce_services.tika.version}/tika-server-standard-{cfg.ce_services.tika.version}.jar"  # noqa: E501
-        for mirror in cfg.ce_services.tika.mirrors:
-            if mirror[-1] == "/":
-                url = f"{mirror}{url_path}"
-            else:
-                url = f"{mirror}/{url_path}"
-            try:
-                download(url, tika_path)
-                break
-            except HTTPError:
-                warn(f"Tika {cfg.ce_services.tika.version} not found at {url}")
-                continue
-            except URLError:
-                warn(f"{mirror} currently not reachable")
-                continue
-        else:
-            die(  # pylint: disable=broad-exception-raised
-                "Could not download Apache Tika from any of the mirrors."
-            )
+        mv(target.dirname() / rabbitmq_name, target)
+        return url, archive_path
+
+    if not manifest.install("rabbitmq", version, rabbitmq_install_dir / version, build):
+        debug(f"Using cached rabbitmq-server ({rabbitmq_install_dir / version})")
+
+
+#: Options passed to Erlang's configure script when compiling it from source.
+ERLANG_CONFIGURE_OPTS = (
+    "--without-wx",  # no wxWidgets support
+    "--without-odbc",  # no ODBC support
+)
+
+
+def _erlang_build_url(version):
+    """
+    Return the pseudo URL identifying the Erlang build of ``version`` for the
+    current platform and libc in the download cache.
+    """
+    libc, libc_version = platform.libc_ver()
+    opts = hashlib.sha256(" ".join(ERLANG_CONFIGURE_OPTS).encode()).hexdigest()[:12]
+    return (
+        f"build://erlang/{sys.platform}-{platform.machine()}"
+        f"-{libc or 'unknown'}{libc_version}/{opts}/otp_{version}.tar.gz"
+    )
+
+
+def _compile_erlang(cfg, url, erlang_name, prefix):
+    """
+    Compile and install Erlang from the sources at ``url``. Returns the path
+    of the cached source archive.
+    """
+    from subprocess import DEVNULL  # noqa: F401 # nosec
+
+    from csspin_ce._cache import fetch
+
+    with TemporaryDirectory() as tmp_dir:
+        archive_path = fetch(cfg, url, extract_to=tmp_dir, member=erlang_name)
+        debug(f"Compiling Erlang into {prefix}")
+
+        # Pass cwd instead of using spin.cd, since the working directory is
+        # process-wide and other installers may run concurrently. For the same
+        # reason the commands don't enter the subprocess environment, which
+        # patches os.environ.
+        build_opts = {
+            "cwd": Path(tmp_dir) / erlang_name,
+            "stdout": DEVNULL if cfg.verbosity <= Verbosity.NORMAL else None,
+            "use_subprocess_environment": False,
+        }
+        sh("./configure", f"--prefix={prefix}", *ERLANG_CONFIGURE_OPTS, **build_opts)
+        sh("make", f"-j{os.cpu_count() or 1}", **build_opts)
+        sh("make", "install", **build_opts)
+    return archive_path
+
+
+def _relocate_erlang(cfg, location, prefix):
+    """
+    Adjust the Erlang installation at ``location``, which has been compiled
+    for another location or unpacked from a prebuilt tarball, to be run from
+    ``prefix``.
+    """
+    from subprocess import DEVNULL  # noqa: F401 # nosec
+
+    erl_root = location / "lib" / "erlang"
+    # With -cross, Install adjusts the installation in its working directory
+    # to be run from the root passed, which doesn't need to exist yet.
+    sh(
+        erl_root / "Install",
+        "-cross",
+        "-minimal",
+        prefix / "lib" / "erlang",
+        cwd=erl_root,
+        stdout=DEVNULL if cfg.verbosity <= Verbosity.NORMAL else None,
+        use_subprocess_environment=False,
+    )
+    # The links to the executables point into the location Erlang has been
+    # built in, in case it has been built with absolute bindir symlinks.
+    location = location.absolute()
+    for link in (location / "bin").iterdir():
+        if (
+            link.islink()
+            and (dest := link.readlink()).isabs()
+            and os.path.commonpath([dest, location]) == location
+        ):
+            link.remove()
+            Path(os.path.relpath(dest, link.dirname())).symlink(link)
+
+
+def _install_erlang(cfg, manifest):
+    """
+    Installation of the Erlang programming language
+
+    On Linux, Erlang is compiled from source once per version and platform.
+    The build is then kept in the download cache, so that later provisioning
+    merely unpacks it.
+    """
+    from csspin_ce._cache import fetch, lock, lookup, staging_path, store
+    from csspin_ce._utils import extract
+
+    version = str(cfg.ce_services.rabbitmq.erlang.version)
+    erlang_install_dir = Path(cfg.ce_services.rabbitmq.erlang.install_dir)
+    prefix = erlang_install_dir / version
+
+    def build(target):
+        debug(f"Installing Erlang {version}")
+        url = _erlang_url(cfg)
+        if sys.platform == "win32":
+            return url, fetch(cfg, url, extract_to=target)
+
+        build_cache = cfg.ce_services.rabbitmq.erlang.build_cache
+        build_url = _erlang_build_url(version)
+        if build_cache and (prebuilt := lookup(cfg, build_url)):
+            debug(f"Using prebuilt Erlang {version} ({prebuilt})")
+            extract(prebuilt, target)
+            _relocate_erlang(cfg, target, prefix)
+            return build_url, prebuilt
+
+        archive_path = _compile_erlang(cfg, url, f"otp_src_{version}", target)
+        # Relocated beforehand, the cached build contains relative links only.
+        _relocate_erlang(cfg, target, prefix)
+        if build_cache:
+            debug(f"Adding Erlang {version} to the download cache")
+            with lock(cfg, build_url):
+                with tarfile.open(
+                    tarball := staging_path(cfg, build_url), "w:gz"
+                ) as tar:
+                    tar.add(target, arcname=".")
+                store(cfg, build_url, tarball)
+        return url, archive_path
+
+    manifest.install("erlang", version, prefix, build)
+
+
+def _install_tika(cfg, manifest):
+    """Download the Apache Tika server jar from the first mirror providing it."""
+    from csspin_ce._cache import fetch_first
 
-    install_traefik(cfg)
-    install_redis(cfg)
+    version = cfg.ce_services.tika.version
+    tika_path = cfg.ce_services.tika.install_dir / f"tika-server-standard-{version}.jar"
+
+    def build(target):
+        debug(f"Installing apache tika {version}")
+        url, archive_path = fetch_first(cfg, _tika_urls(cfg), f"Apache Tika {version}")
+        shutil.copyfile(archive_path, target)
+        return url, archive_path
+
+    manifest.install("tika", version, tika_path, build)
+
+
+def artifacts(cfg):
+    """
+    The archives the enabled tools are provisioned from, as pairs of a
+    description and the URLs providing the archive, in order of preference.
+    """
+    from csspin_ce._cache import lookup
+
+    found = [(f"Traefik {cfg.ce_services.traefik.version}", [_traefik_url(cfg)])]
+    if sys.platform == "win32":
+        found.append((f"redis {cfg.ce_services.redis.version}", [_redis_url(cfg)]))
+    if not cfg.ce_services.solr.use:
+        found.append((f"Apache Solr {cfg.ce_services.solr.version}", _solr_urls(cfg)))
+    if cfg.ce_services.hivemq.enabled:
+        found.append((f"HiveMQ {cfg.ce_services.hivemq.version}", [_hivemq_url(cfg)]))
+    if cfg.ce_services.influxdb.enabled:
+        found.append(
+            (f"InfluxDB {cfg.ce_services.influxdb.version}", [_influxdb_url(cfg)])
+        )
+    if cfg.ce_services.rabbitmq.enabled:
+        erlang_version = str(cfg.ce_services.rabbitmq.erlang.version)
+        found.append((f"Erlang {erlang_version}", [_erlang_url(cfg)]))
+        # Ship the compiled Erlang as well, if available, so that hosts of the
+        # same platform don't need to compile it.
+        build_url = _erlang_build_url(erlang_version)
+        if (
+            sys.platform != "win32"
+            and cfg.ce_services.rabbitmq.erlang.build_cache
+            and lookup(cfg, build_url)
+        ):
+            found.append((f"Erlang {erlang_version} build", [build_url]))
+        found.append(
+            (f"RabbitMQ {cfg.ce_services.rabbitmq.version}", [_rabbitmq_url(cfg)])
+        )
+    if cfg.contact_elements.umbrella not in ("16.0", "2026.1"):
+        found.append((f"Apache Tika {cfg.ce_services.tika.version}", _tika_urls(cfg)))
+    return found
+
+
+def provision(cfg):
+    """
+    Provision tools necessary to startup all ce_services.
+
+    Independent installers run concurrently on a pool of
+    ``ce_services.jobs`` workers, while RabbitMQ waits for Erlang. Tools
+    recorded as completely installed in the manifest are skipped.
+    """
+    from csspin_ce._jobs import run_jobs
+    from csspin_ce._manifest import Manifest
+    from csspin_ce._trace import span, write_trace
+
+    jobs = {"traefik": (_install_traefik, ()), "redis": (_install_redis, ())}
 
     if cfg.ce_services.solr.use:
         if cfg.ce_services.solr.version:
@@ -536,28 +990,74 @@ def provision(cfg):  # pylint: disable=too-many-statements
             )
 
     if not cfg.ce_services.solr.use:
-        install_solr(cfg)
+        jobs["solr"] = (_install_solr, ())
 
     if cfg.ce_services.hivemq.enabled:
-        install_hivemq(cfg)
+        jobs["hivemq"] = (_install_hivemq, ())
 
     if cfg.ce_services.influxdb.enabled:
-        install_influxdb(cfg)
+        jobs["influxdb"] = (_install_influxdb, ())
 
     if cfg.ce_services.rabbitmq.enabled:
-        install_rabbitmq(cfg)
-        install_erlang(cfg)
+        jobs["erlang"] = (_install_erlang, ())
+        jobs["rabbitmq"] = (_install_rabbitmq, ("erlang",))
 
     if cfg.contact_elements.umbrella not in ("16.0", "2026.1"):
-        install_tika(cfg)
+        jobs["tika"] = (_install_tika, ())
+
+    invalidate_environment(cfg)
+    manifest = Manifest(cfg)
+    try:
+        with span("ce_services.provision"):
+            run_jobs(
+                {
+                    name: (partial(func, cfg, manifest), requires)
+                    for name, (func, requires) in jobs.items()
+                },
+                max_workers=int(cfg.ce_services.jobs),
+            )
+    finally:
+        write_trace(cfg)
 
 
 def init(cfg):
     """
     Set all provisioned tools into the PATH variable.
+
+    The environment is computed once per configuration and cached until the
+    next provisioning, since it is needed by every spin command.
     """
+    key = {
+        "ce_services": cfg.ce_services,
+        "umbrella": cfg.contact_elements.umbrella,
+        "instance_location": cfg.mkinstance.base.instance_location,
+        "spin_dir": cfg.spin.spin_dir,
+        # The Solr executable is looked up in the PATH.
+        "PATH": os.getenv("PATH") if cfg.ce_services.solr.use else None,
+    }
+    if cfg.ce_services.hivemq.enabled:
+        # Checked for every command, since the directory isn't provisioned by
+        # spin and may vanish while the environment is cached.
+        hivemq_intgr_dir = cfg.ce_services.hivemq.elements_integration.install_dir
+        if not hivemq_intgr_dir or not exists(hivemq_intgr_dir):
+            die(
+                "CONTACT Elements HiveMQ Integration installation directory"
+                f" does not exist. ({hivemq_intgr_dir})"
+            )
+    environment = cached_environment(
+        cfg, "ce_services", key, lambda: _init_environment(cfg)
+    )
+    path_extensions = environment.pop("PATH")
+    if environment:
+        setenv(**environment)
+    setenv(PATH=f"{path_extensions}{os.pathsep}{os.getenv('PATH', '')}")
+
+
+def _init_environment(cfg):
+    """Compute the environment variables to set by the init hook."""
+    environment = {}
     path_extensions = {
-        cfg.ce_services.traefik.install_dir / cfg.ce_services.traefik.version,
+        cfg.ce_services.traefik.install_dir / cfg.ce_services.traefik.version: None,
     }
 
     if cfg.ce_services.solr.use:
@@ -569,68 +1069,54 @@ def init(cfg):
                 f"Cannot find Solr executable: {cfg.ce_services.solr.use}. "
                 "Please check your configuration."
             )
-        path_extensions.add(solr_path)
+        path_extensions[solr_path] = None
 
     else:
-        path_extensions.add(
+        path_extensions[
             cfg.ce_services.solr.install_dir
             / f"solr-{cfg.ce_services.solr.version}{cfg.ce_services.solr.version_postfix}"
             / "bin"
-        )
+        ] = None
 
     if sys.platform == "win32":
-        path_extensions.add(
+        path_extensions[
             cfg.ce_services.redis.install_dir / cfg.ce_services.redis.version
-        )
+        ] = None
 
     if cfg.ce_services.influxdb.enabled:
-        path_extensions.add(
+        path_extensions[
             cfg.ce_services.influxdb.install_dir / cfg.ce_services.influxdb.version
-        )
+        ] = None
 
     if cfg.ce_services.hivemq.enabled:
         hivemq_intgr_dir = cfg.ce_services.hivemq.elements_integration.install_dir
-
-        if not hivemq_intgr_dir or not exists(hivemq_intgr_dir):
-            die(
-                "CONTACT Elements HiveMQ Integration installation directory"
-                f" does not exist. ({hivemq_intgr_dir})"
-            )
-
-        setenv(
-            HIVEMQ_HOME=cfg.ce_services.hivemq.install_dir
-            / cfg.ce_services.hivemq.version
-        )
-        setenv(
-            HIVEMQ_EXTENSION_FOLDER=cfg.ce_services.hivemq.elements_integration.install_dir
-        )
+        environment |= {
+            "HIVEMQ_HOME": cfg.ce_services.hivemq.install_dir
+            / cfg.ce_services.hivemq.version,
+            "HIVEMQ_EXTENSION_FOLDER": hivemq_intgr_dir,
+        }
 
     if cfg.ce_services.rabbitmq.enabled:
-        path_extensions.add(
-            (
-                rabbitmq_home := cfg.ce_services.rabbitmq.install_dir
-                / cfg.ce_services.rabbitmq.version
-            )
-            / "sbin"
+        rabbitmq_home = (
+            cfg.ce_services.rabbitmq.install_dir / cfg.ce_services.rabbitmq.version
         )
-        path_extensions.add(
+        erlang_home = (
             cfg.ce_services.rabbitmq.erlang.install_dir
             / cfg.ce_services.rabbitmq.erlang.version
-            / "bin"
-        )
-        setenv(
-            RABBITMQ_HOME=rabbitmq_home,
-            RABBITMQ_MNESIA_DIR=cfg.spin.spin_dir / "rabbitmq",
-            RABBITMQ_LOG_BASE=cfg.mkinstance.base.instance_location / "tmp",
-            ERLANG_HOME=cfg.ce_services.rabbitmq.erlang.install_dir
-            / cfg.ce_services.rabbitmq.erlang.version,
         )
+        path_extensions[rabbitmq_home / "sbin"] = None
+        path_extensions[erlang_home / "bin"] = None
+        environment |= {
+            "RABBITMQ_HOME": rabbitmq_home,
+            "RABBITMQ_MNESIA_DIR": cfg.spin.spin_dir / "rabbitmq",
+            "RABBITMQ_LOG_BASE": cfg.mkinstance.base.instance_location / "tmp",
+            "ERLANG_HOME": erlang_home,
+        }
     if cfg.contact_elements.umbrella not in ("16.0", "2026.1"):
-        setenv(
-            TIKA_PATH=cfg.ce_services.tika.install_dir
+        environment["TIKA_PATH"] = (
+            cfg.ce_services.tika.install_dir
             / f"tika-server-standard-{cfg.ce_services.tika.version}.jar"
         )
 
-    setenv(
-        PATH=f"{os.pathsep.join([str(e) for e in path_extensions])}{os.pathsep}{os.getenv('PATH', '')}"
-    )
+    environment["PATH"] = os.pathsep.join(str(e) for e in path_extensions)
+    return environment
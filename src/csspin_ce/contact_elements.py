@@ -21,9 +21,29 @@ Provides the configuration of `contact_elements.umbrella` which changes the
 behavior of the other plugins of the csspin-ce plugin-package.
 """
 
-from csspin import config, interpolate1, warn
+import click
+from csspin import argument, config, group, info, interpolate1, warn
 
-defaults = config()
+defaults = config(
+    cache=config(
+        directory="{spin.data}/csspin_ce/cache",
+        max_size=4096,
+    ),
+    download=config(
+        retries=3,
+        segments=1,
+        min_segment_size=16,
+        timeout=60,
+        probe_timeout=5,
+        mirror_ttl=3600,
+    ),
+    extract=config(workers=4),
+    manifest=config(
+        file="{spin.data}/csspin_ce/manifest.json",
+        verify=False,
+    ),
+    trace="{spin.spin_dir}/csspin_ce/provision_trace.json",
+)
 
 
 def configure(cfg):
@@ -36,3 +56,55 @@ def configure(cfg):
             "This version might not be supported. Possible known values are: "
             f"{ALLOWED_VERSIONS}"
         )
+
+
+def _artifacts(cfg):
+    """
+    Collect the archives to provision from all loaded plugins of the
+    csspin_ce plugin-package providing an ``artifacts`` function.
+    """
+    return [
+        artifact
+        for name, module in cfg.loaded.items()
+        if name.startswith("csspin_ce.") and hasattr(module, "artifacts")
+        for artifact in module.artifacts(cfg)
+    ]
+
+
+@group("ce-bundle", noenv=True)
+def ce_bundle(ctx):  # pylint: disable=unused-argument
+    """Export and import the archives to provision, e.g. for offline hosts."""
+
+
+@ce_bundle.task("export")
+def bundle_export(
+    cfg,
+    bundle: argument(type=click.Path(dir_okay=False)),  # noqa: F821
+):
+    """
+    Download all archives required to provision the tools of the current
+    project on this platform and write them into BUNDLE.
+    """
+    from csspin_ce._cache import export_bundle, fetch_first
+
+    artifacts = {}
+    for what, urls in _artifacts(cfg):
+        url, archive = fetch_first(cfg, urls, what)
+        artifacts[url] = archive
+    export_bundle(cfg, artifacts, bundle)
+    info(f"Exported {len(artifacts)} archives into {bundle}")
+
+
+@ce_bundle.task("import")
+def bundle_import(
+    cfg,
+    bundle: argument(type=click.Path(exists=True, dir_okay=False)),  # noqa: F821
+):
+    """
+    Import the archives of BUNDLE into the download cache, so that
+    provisioning doesn't need to download them.
+    """
+    from csspin_ce._cache import import_bundle
+
+    urls = import_bundle(cfg, bundle)
+    info(f"Imported {len(urls)} archives from {bundle}")
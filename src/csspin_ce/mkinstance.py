@@ -22,26 +22,23 @@ Create a fresh instance based on spinfile.yaml configuration.
 - Provides sensible defaults for other options
 """
 
-import getpass
 import os
 import platform
 import shutil
 import socket
 import sys
 import zlib
-from tempfile import TemporaryDirectory
 
 from click import Choice
+from click import Path as ClickPath
 from csspin import (
     argument,
     config,
     debug,
     die,
-    download,
     info,
     mkdir,
     option,
-    rmtree,
     setenv,
     sh,
     task,
@@ -50,7 +47,7 @@ from csspin import (
 from csspin.tree import ConfigTree
 from path import Path
 
-from csspin_ce._utils import extract
+from csspin_ce._environment import cached_environment, invalidate_environment
 
 
 def default_id(cfg):
@@ -61,10 +58,22 @@ def default_id(cfg):
     if callable(inst_location):
         inst_location = inst_location(cfg)
 
+    return _instance_id(inst_location)
+
+
+def _instance_id(inst_location):
+    """The default id of the instance at ``inst_location``."""
+    import getpass
+
     vstr = f"{platform.node()}:{inst_location}".encode()
     return f"{getpass.getuser()}_bo{abs(zlib.adler32(vstr))}"
 
 
+def default_dns_names(cfg):  # pylint: disable=unused-argument
+    """Compute the default DNS names for the TLS certificate."""
+    return ["localhost", socket.gethostname()]
+
+
 def default_location(cfg):
     """Compute a default location for the instance."""
     return Path(cfg.spin.project_root) / cfg.mkinstance.dbms
@@ -81,8 +90,12 @@ defaults = config(
     tls=config(
         cert="{mkinstance.base.instance_location}/certs/localhost.crt",
         cert_key="{mkinstance.base.instance_location}/certs/localhost.key",
-        dns_names=["localhost", socket.gethostname()],
+        dns_names=default_dns_names,
         enabled=False,
+        key_type="rsa",
+        validity=365,
+        renew_before=30,
+        cache="{spin.data}/csspin_ce/tls",
     ),
     # DBMS-agnostic options
     base=config(
@@ -132,6 +145,19 @@ defaults = config(
         azure_account_name=None,
     ),
     graphviz=config(install_dir="{spin.data}/graphviz", version="14.1.0"),
+    fingerprints=config(
+        webmake=["*package.json", "*yarn.lock", "*/js/*"],
+        cdbpkg=["*/configuration/*", "*setup.py", "*setup.cfg", "*pyproject.toml"],
+        exclude=[".*", "node_modules", "__pycache__", "*.egg-info"],
+    ),
+    snapshots=config(
+        enabled=False,
+        directory="{spin.data}/csspin_ce/snapshots",
+        keep=3,
+    ),
+    trash="{spin.spin_dir}/csspin_ce/trash",
+    matrix=config(jobs=2, logs="{spin.spin_dir}/csspin_ce/mkinstance"),
+    mutable=["etc", "tmp", "log", "*.db", "*.db-*", "*.sqlite*"],
     requires=config(
         python=["cs.platform"],
         npm=["sass", "yarn"],
@@ -168,6 +194,20 @@ def init(cfg):
     if cfg.mkinstance.base.instance_location.is_dir():
         setenv(CADDOK_BASE=cfg.mkinstance.base.instance_location)
 
+    key = {
+        "graphviz": cfg.mkinstance.graphviz,
+        # graphviz is looked up in the PATH.
+        "PATH": os.getenv("PATH") if cfg.mkinstance.graphviz.use else None,
+    }
+    environment = cached_environment(
+        cfg, "mkinstance", key, lambda: _init_environment(cfg)
+    )
+    if graphviz_bin_dir := environment.get("PATH"):
+        setenv(PATH=os.pathsep.join((graphviz_bin_dir, "{PATH}")))  # noqa: E501
+
+
+def _init_environment(cfg):
+    """Compute the environment variables to set by the init hook."""
     if cfg.mkinstance.graphviz.use:
         graphviz = shutil.which(cfg.mkinstance.graphviz.use)
         if not graphviz:
@@ -175,48 +215,114 @@ def init(cfg):
                 f"Cannot find graphviz installation: {cfg.mkinstance.graphviz.use}. "
                 "Please check your configuration."
             )
-    else:
-        graphviz_bin_dir = (
-            cfg.mkinstance.graphviz.install_dir
-            / cfg.mkinstance.graphviz.version
-            / "bin"
-        )
-        setenv(PATH=os.pathsep.join((graphviz_bin_dir, "{PATH}")))  # noqa: E501
+        return {}
+    return {
+        "PATH": cfg.mkinstance.graphviz.install_dir
+        / cfg.mkinstance.graphviz.version
+        / "bin"
+    }
+
+
+#: The keys of the TLS certificates by ``mkinstance.tls.key_type``.
+_TLS_KEY_TYPES = ("rsa", "ecdsa")
 
 
 def _create_tls_cert(cfg: ConfigTree, cert_dir: Path) -> None:
-    """Create a self-signed SSL/TLS certificate and private key."""
+    """
+    Provide a self-signed SSL/TLS certificate and private key in ``cert_dir``.
+    They are cached per host and DNS names, and reused until they near their
+    expiry.
+    """
+    from csspin_ce._utils import file_lock, fingerprint
+
+    tls = cfg.mkinstance.tls
+    if tls.key_type not in _TLS_KEY_TYPES:
+        die(
+            f"Unknown mkinstance.tls.key_type '{tls.key_type}', use one of"
+            f" {', '.join(_TLS_KEY_TYPES)}."
+        )
+    key = fingerprint(
+        dns_names=sorted(set(tls.dns_names)),
+        key_type=tls.key_type,
+        validity=int(tls.validity),
+    )[:16]
+    cached = Path(tls.cache) / key
+    with file_lock(Path(tls.cache) / f".{key}.lock"):
+        if _tls_cert_expires(cached / "localhost.crt", int(tls.renew_before)):
+            mkdir(cached)
+            _generate_tls_cert(cfg, cached)
+        else:
+            debug(f"Using the cached TLS certificate {cached / 'localhost.crt'}")
+        shutil.copyfile(cached / "localhost.crt", cert_dir / "localhost.crt")
+        # copyfile creates files according to the umask, keep the key private.
+        (cert_dir / "localhost.key").remove_p()
+        with (
+            open(cached / "localhost.key", "rb") as source,
+            os.fdopen(
+                os.open(
+                    cert_dir / "localhost.key",
+                    os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                    0o600,
+                ),
+                "wb",
+            ) as target,
+        ):
+            shutil.copyfileobj(source, target)
+    info(f"Provided '{cert_dir / 'localhost.crt'}' and '{cert_dir / 'localhost.key'}'.")
+
+
+def _tls_cert_expires(cert_file, days):
+    """Whether the certificate ``cert_file`` is missing or expires within ``days``."""
+    import datetime
+
+    from cryptography import x509
+
+    try:
+        cert = x509.load_pem_x509_certificate(cert_file.read_bytes())
+    except (OSError, ValueError):
+        return True
+    remaining = cert.not_valid_after_utc - datetime.datetime.now(datetime.timezone.utc)
+    return remaining < datetime.timedelta(days=days)
+
+
+def _generate_tls_cert(cfg: ConfigTree, cert_dir: Path) -> None:
+    """Generate a self-signed SSL/TLS certificate and private key."""
     # pylint: disable=too-many-locals
     import datetime
     import ipaddress
 
     from cryptography import x509
     from cryptography.hazmat.primitives import hashes, serialization
-    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
     from cryptography.x509.oid import NameOID
 
-    key = rsa.generate_private_key(public_exponent=65537, key_size=4096)
+    if cfg.mkinstance.tls.key_type == "ecdsa":
+        # Much faster to generate and to handshake with than RSA keys.
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=4096)
     subject = issuer = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
 
     alt_names = [
         x509.DNSName(dns_name) for dns_name in cfg.mkinstance.tls.dns_names
     ] + [x509.IPAddress(ipaddress.IPv4Address("127.0.0.1"))]
 
+    now = datetime.datetime.now(datetime.timezone.utc)
     cert = (
         x509.CertificateBuilder()
         .subject_name(subject)
         .issuer_name(issuer)
         .public_key(key.public_key())
         .serial_number(x509.random_serial_number())
-        .not_valid_before(datetime.datetime.now(datetime.timezone.utc))
+        .not_valid_before(now)
         .not_valid_after(
-            datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=365)
+            now + datetime.timedelta(days=int(cfg.mkinstance.tls.validity))
         )
         .add_extension(x509.SubjectAlternativeName(alt_names), critical=False)
         .sign(key, hashes.SHA256())
     )
 
-    with open(tls_cert := cert_dir / "localhost.key", "wb") as f:
+    with open(tls_key := cert_dir / "localhost.key", "wb") as f:
         f.write(
             key.private_bytes(
                 encoding=serialization.Encoding.PEM,
@@ -224,43 +330,52 @@ def _create_tls_cert(cfg: ConfigTree, cert_dir: Path) -> None:
                 encryption_algorithm=serialization.NoEncryption(),
             )
         )
+    tls_key.chmod(0o600)
 
-    with open(tls_key := cert_dir / "localhost.crt", "wb") as f:
+    with open(tls_cert := cert_dir / "localhost.crt", "wb") as f:
         f.write(cert.public_bytes(serialization.Encoding.PEM))
 
-    info(f"Generated '{tls_key}' and '{tls_cert}'.")
+    info(f"Generated '{tls_cert}' and '{tls_key}'.")
+
+
+def _graphviz_url(cfg):
+    return f"https://gitlab.com/api/v4/projects/4207231/packages/generic/graphviz-releases/{cfg.mkinstance.graphviz.version}/windows_10_cmake_Release_Graphviz-{cfg.mkinstance.graphviz.version}-win64.zip"  # noqa: E501
+
+
+def artifacts(cfg):
+    """
+    The archives the tools necessary for mkinstance are provisioned from, as
+    pairs of a description and the URLs providing the archive.
+    """
+    if sys.platform == "win32" and not cfg.mkinstance.graphviz.use:
+        return [(f"graphviz {cfg.mkinstance.graphviz.version}", [_graphviz_url(cfg)])]
+    return []
 
 
 def provision(cfg):
     """
     Provision tools necessary for mkinstance.
     """
+    from csspin_ce._cache import fetch
+    from csspin_ce._manifest import Manifest
+    from csspin_ce._trace import span, write_trace
 
-    def install_graphviz(cfg):
+    def install_graphviz(cfg, manifest):
         if sys.platform == "win32":
-            graphviz_install_dir = (
-                cfg.mkinstance.graphviz.install_dir / cfg.mkinstance.graphviz.version
-            )
-            graphviz = graphviz_install_dir / "bin"
-            if not graphviz.exists():
-                mkdir(cfg.mkinstance.graphviz.install_dir)
+            version = cfg.mkinstance.graphviz.version
+            graphviz_install_dir = cfg.mkinstance.graphviz.install_dir / version
+
+            def build(target):
                 debug("Installing graphviz")
-                with TemporaryDirectory() as tmp_dir:
-                    graphviz_archive = (
-                        Path(tmp_dir)
-                        / f"graphviz-windows-{cfg.mkinstance.graphviz.version}.zip"
-                    )
-                    download(
-                        f"https://gitlab.com/api/v4/projects/4207231/packages/generic/graphviz-releases/{cfg.mkinstance.graphviz.version}/windows_10_cmake_Release_Graphviz-{cfg.mkinstance.graphviz.version}-win64.zip",  # noqa: E501
-                        graphviz_archive,
-                    )
-                    extract(graphviz_archive, cfg.mkinstance.graphviz.install_dir)
-                    (
-                        cfg.mkinstance.graphviz.install_dir
-                        / f"Graphviz-{cfg.mkinstance.graphviz.version}-win64"
-                    ).rename(graphviz_install_dir)
-            else:
-                debug(f"Using cached graphviz installation ({graphviz})")
+                url = _graphviz_url(cfg)
+                archive = fetch(cfg, url, extract_to=target.dirname())
+                (target.dirname() / f"Graphviz-{version}-win64").rename(target)
+                return url, archive
+
+            if not manifest.install("graphviz", version, graphviz_install_dir, build):
+                debug(
+                    f"Using cached graphviz installation ({graphviz_install_dir / 'bin'})"
+                )
         elif not shutil.which("dot"):
             warn(
                 'Cannot provision "graphviz" on Linux.'
@@ -273,30 +388,67 @@ def provision(cfg):
                 "mkinstance.graphviz.version will be ignored, using '{mkinstance.graphviz.use}' instead."
             )
 
+    invalidate_environment(cfg)
     if not cfg.mkinstance.graphviz.use:
-        install_graphviz(cfg)
+        try:
+            with span("mkinstance.provision"), span("graphviz"):
+                install_graphviz(cfg, Manifest(cfg))
+        finally:
+            write_trace(cfg)
+
+
+#: The DBMS supported by mkinstance.
+_DBMS = (
+    "azure_blobstore",
+    "mssql_sspi",
+    "mysql",
+    "oracle",
+    "postgres",
+    "s3_blobstore",
+    "sqlite",
+)
 
 
 @task()
-def mkinstance(
+def mkinstance(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     cfg,
     rebuild: option(
         "--rebuild",  # noqa: F821
         is_flag=True,
-        help="Remove an existing instance prior creating the new one.",  # noqa: F722
+        help=(
+            "Remove an existing instance in the background prior"  # noqa: F722
+            " creating the new one."  # noqa: F722
+        ),
     ),
-    dbms: argument(  # noqa: F821
-        type=Choice(
-            (
-                "azure_blobstore",  # noqa: F821
-                "mssql_sspi",  # noqa: F821
-                "mysql",  # noqa: F821
-                "oracle",  # noqa: F821
-                "postgres",  # noqa: F821
-                "s3_blobstore",  # noqa: F821
-                "sqlite",  # noqa: F821
-            ),
+    refresh: option(
+        "--refresh",  # noqa: F821
+        is_flag=True,
+        help=(
+            "Update an existing instance by running the steps whose"  # noqa: F722
+            " sources changed."  # noqa: F722
+        ),
+    ),
+    clone_from: option(
+        "--clone-from",  # noqa: F722
+        type=ClickPath(exists=True, file_okay=False),
+        help="Clone the instances from this prepared instance.",  # noqa: F722
+    ),
+    count: option(
+        "--count",  # noqa: F821
+        type=int,
+        default=1,
+        show_default=True,
+        help="The number of instances to clone using --clone-from.",  # noqa: F722
+    ),
+    matrix: option(
+        "--matrix",  # noqa: F821
+        help=(
+            "Build the instances of the comma-separated DBMS"  # noqa: F722
+            " concurrently."  # noqa: F722
         ),
+    ),
+    dbms: argument(  # noqa: F821
+        type=Choice(_DBMS),
         nargs=1,
         required=False,
     ),
@@ -308,7 +460,32 @@ def mkinstance(
     sync. The JS bundles themselves are not built here; 'setuptools_ce' already
     builds them when 'csspin_python' installs the local package during
     provisioning.
+
+    Using --refresh, an existing instance is updated by running only the
+    steps whose sources changed since they last ran for it.
+
+    Using --matrix, the instances of several DBMS are built concurrently by
+    separate spin processes, each writing its output into a log file of its
+    own.
+
+    Using --clone-from, COUNT instances are cloned from a prepared instance
+    instead, e.g. one per worker of parallel tests, named like the instance
+    suffixed by '-0', '-1' and so on.
     """
+    from csspin_ce import _trash
+
+    # Remove the leftovers of earlier runs that have been killed.
+    _trash.empty(cfg.mkinstance.trash)
+
+    if matrix:
+        _build_matrix(cfg, matrix.split(","), rebuild)
+        return
+    if clone_from:
+        if (dbms or cfg.mkinstance.dbms) != "sqlite":
+            die("Only instances using sqlite can be cloned.")
+        _clone_instances(cfg, Path(os.path.abspath(clone_from)), count, rebuild)
+        return
+
     instancedir = cfg.mkinstance.base.instance_location
     instance_default_location = default_location(cfg)
     if dbms and instancedir == instance_default_location:
@@ -335,7 +512,7 @@ def mkinstance(
     )
 
     if rebuild and instancedir.is_dir():
-        rmtree(instancedir)
+        _trash.remove(instancedir, cfg.mkinstance.trash)
         setenv(CADDOK_BASE=None)
 
     if not instancedir.is_dir() and os.getenv("CADDOK_BASE", None) is not None:
@@ -348,23 +525,239 @@ def mkinstance(
     dbms = dbms or cfg.mkinstance.dbms
     if not instancedir.is_dir():
         if cfg.mkinstance.tls.enabled:
-            if tls_cert.parent == instancedir / "certs":
-                mkdir(tls_cert.parent)
-                _create_tls_cert(cfg, tls_cert.parent)
             opts.append(f"--sslca={tls_cert}")
-
         dbms_opts = to_cli_options(cfg.mkinstance.get(dbms, {}))
-        sh("mkinstance", *opts, dbms, *dbms_opts, shell=False)
-
-        if cfg.mkinstance.webmake:
-            sh("webmake", "--instancedir", instancedir, "devupdate")
-
-        # Run cdbpkg sync on the new install
-        sh("cdbpkg", "--instancedir", instancedir, "sync")
-        setenv(
-            CADDOK_BASE=instancedir
-        )  # Needed, for using this task in custom tasks via the extra_tasks option
+        _create(cfg, dbms, instancedir, tls_cert, [*opts, dbms, *dbms_opts])
+    elif refresh:
+        _refresh(cfg, instancedir)
     else:
         die(
-            "There already exists an instance, if you want to rebuild, try the '--rebuild' option"
+            "There already exists an instance, if you want to rebuild, try the"
+            " '--rebuild' or '--refresh' option"
+        )
+    setenv(
+        CADDOK_BASE=instancedir
+    )  # Needed, for using this task in custom tasks via the extra_tasks option
+
+
+def _create(cfg, dbms, instancedir, tls_cert, options):
+    """Create the instance, restoring a snapshot of it if there is one."""
+    from csspin_ce import _snapshot
+
+    snapshot = _snapshot_key(cfg, dbms, options)
+    if snapshot and _snapshot.restore(cfg, snapshot, instancedir):
+        # The sources may have changed since the snapshot was stored.
+        _refresh(cfg, instancedir)
+        return
+    _build(cfg, instancedir, tls_cert, options)
+    if snapshot:
+        _snapshot.store(cfg, snapshot, instancedir)
+
+
+def _build(cfg, instancedir, tls_cert, options):
+    """Build the instance by mkinstance, webmake and cdbpkg."""
+    if cfg.mkinstance.tls.enabled and tls_cert.parent == instancedir / "certs":
+        mkdir(tls_cert.parent)
+        _create_tls_cert(cfg, tls_cert.parent)
+
+    sh("mkinstance", *options, shell=False)
+    _refresh(cfg, instancedir, force=True)
+
+
+def _refresh(cfg, instancedir, force=False):
+    """
+    Run 'webmake devupdate' if webmake is enabled, followed by 'cdbpkg sync',
+    unless their sources didn't change since they ran for ``instancedir`` and
+    ``force`` isn't set.
+    """
+    from csspin_ce import _fingerprint
+
+    steps = {}
+    if cfg.mkinstance.webmake:
+        steps["webmake"] = ("webmake", "--instancedir", instancedir, "devupdate")
+    steps["cdbpkg"] = ("cdbpkg", "--instancedir", instancedir, "sync")
+
+    root = cfg.spin.project_root
+    packages = _installed_packages(cfg)
+    recorded = _fingerprint.recorded(instancedir)
+
+    def sources_fingerprint(step, files):
+        return _fingerprint.sources_fingerprint(
+            root, files, cfg.mkinstance.fingerprints[step], packages=packages
         )
+
+    exclude = cfg.mkinstance.fingerprints.exclude
+    files = _fingerprint.source_files(root, exclude)
+    for step, cmd in steps.items():
+        if not force and recorded.get(step) == sources_fingerprint(step, files):
+            info(f"Skipping '{step}', since its sources didn't change")
+            continue
+        sh(*cmd)
+        # Steps like webmake may update their sources, e.g. lock files.
+        files = _fingerprint.source_files(root, exclude)
+        _fingerprint.record(instancedir, step, sources_fingerprint(step, files))
+
+
+def _installed_packages(cfg):
+    """The packages installed in the project's environment, with their versions."""
+    import importlib.metadata
+
+    with cfg.spin.subprocess_environment():
+        return sorted(
+            {
+                f"{dist.metadata['Name']}=={dist.version}"
+                for dist in importlib.metadata.distributions()
+            }
+        )
+
+
+def _snapshot_key(cfg, dbms, options):
+    """
+    The fingerprint of the instance built by mkinstance using ``options``, or
+    ``None`` if it isn't snapshotted.
+    """
+    if not cfg.mkinstance.snapshots.enabled:
+        return None
+    if (
+        dbms != "sqlite"
+        or cfg.mkinstance.s3_blobstore.s3_bucket
+        or cfg.mkinstance.azure_blobstore.azure_container
+    ):
+        info("Not snapshotting the instance, since its data is stored outside")
+        return None
+    from csspin_ce._utils import fingerprint
+
+    return fingerprint(
+        options=options,
+        webmake=cfg.mkinstance.webmake,
+        calendar=cfg.mkinstance.std_calendar_profile_range,
+        umbrella=cfg.contact_elements.umbrella,
+        packages=_installed_packages(cfg),
+    )
+
+
+def _build_matrix(cfg, dbmss, rebuild):
+    """
+    Build an instance per DBMS in ``dbmss`` by running 'spin mkinstance' for
+    each of them on ``mkinstance.matrix.jobs`` threads.
+    """
+    import time
+
+    from csspin_ce._matrix import report, run_matrix
+
+    if unknown := sorted(set(dbmss) - set(_DBMS)):
+        die(f"Unknown DBMS {', '.join(unknown)}, use some of {', '.join(_DBMS)}.")
+    try:
+        # Pass the global options of spin, like -f and -p, to the builds.
+        index = sys.argv.index("mkinstance")
+    except ValueError:
+        die("The option --matrix is only supported by 'spin mkinstance'.")
+    spin = [sys.executable, "-m", "csspin", *sys.argv[1:index]]
+
+    instancedir = cfg.mkinstance.base.instance_location
+    commands = {}
+    for dbms in dbmss:
+        cmd = list(spin)
+        if instancedir != default_location(cfg):
+            # The default location is per DBMS already.
+            cmd += ["-p", f"mkinstance.base.instance_location={instancedir}-{dbms}"]
+        cmd += ["mkinstance", dbms, *(["--rebuild"] if rebuild else [])]
+        commands[dbms] = (cmd, Path(cfg.mkinstance.matrix.logs) / f"{dbms}.log")
+
+    started = time.monotonic()
+    results = run_matrix(
+        commands,
+        int(cfg.mkinstance.matrix.jobs),
+        cwd=cfg.spin.project_root / cfg.spin.launch_dir,
+        env={
+            name: value for name, value in os.environ.items() if name != "CADDOK_BASE"
+        },
+    )
+    if not report(results, started):
+        die("Failed to build the instances of all DBMS.")
+
+
+def _clone_instances(cfg, source, count, rebuild):
+    """
+    Clone ``count`` instances from the instance ``source``, sharing the files
+    not matching ``mkinstance.mutable`` with it where possible.
+    """
+    from csspin_ce import _trash
+    from csspin_ce._utils import clone_tree
+
+    for index in range(count):
+        target = Path(f"{source}-{index}")
+        if target.is_dir():
+            if not rebuild:
+                die(
+                    f"There already exists an instance {target}, if you want to"
+                    " rebuild, try the '--rebuild' option"
+                )
+            _trash.remove(target, cfg.mkinstance.trash)
+        counts = clone_tree(source, target, cfg.mkinstance.mutable)
+        relocated = _relocate_instance(cfg, source, target)
+        info(
+            f"Cloned {target} ({counts['cloned']} files cloned, {counts['linked']}"
+            f" linked, {counts['copied']} copied, {relocated} relocated)"
+        )
+
+
+def _relocate_instance(cfg, source, target):
+    """
+    Replace the location and default id of the instance ``source`` by the ones
+    of ``target`` in the text files of ``target`` that have been copied, as
+    well as the default id in the names of its files, e.g. the database.
+    Returns the number of files changed.
+
+    The location may be given in several forms, e.g. when resolving symlinks
+    or not, and mkinstance computed the id from the configured one. Thus, all
+    forms referring to ``source`` are replaced by the same form of ``target``.
+    """
+    # pylint: disable=too-many-locals
+    import re
+
+    from csspin_ce._utils import matches
+
+    suffix = str(target)[len(str(source)) :]
+    locations = {
+        str(location)
+        for location in (
+            source,
+            source.realpath(),
+            cfg.mkinstance.base.instance_location,
+        )
+        if Path(location).realpath() == source.realpath()
+    }
+    ids = {
+        _instance_id(location): _instance_id(f"{location}{suffix}")
+        for location in locations
+    }
+    replacements = {location: f"{location}{suffix}" for location in locations} | ids
+    # Replace all forms in one pass, preferring the longest ones, since one
+    # form may be contained in another one.
+    pattern = re.compile(
+        "|".join(re.escape(old) for old in sorted(replacements, key=len, reverse=True))
+    )
+    relocated = 0
+    for path in target.walkfiles():
+        if not matches(path.relpath(target), cfg.mkinstance.mutable):
+            continue
+        # Leave binary files like the database alone.
+        with open(path, "rb") as fd:
+            if b"\0" in fd.read(8192):
+                continue
+        try:
+            text = original = path.read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            continue
+        text = pattern.sub(lambda match: replacements[match.group()], text)
+        if text != original:
+            path.write_text(text)
+            relocated += 1
+
+    # Rename the files before the directories containing them.
+    for path in reversed(list(target.walk())):
+        if source_id := next((old for old in ids if old in path.name), None):
+            path.rename(path.parent / path.name.replace(source_id, ids[source_id]))
+            relocated += 1
+    return relocated
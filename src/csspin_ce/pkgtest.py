@@ -17,9 +17,11 @@
 
 """Provides a wrapper around the CLI tool pkgtest."""
 
+import os
 from glob import glob
 
-from csspin import config, die, option, setenv, sh, task
+from csspin import config, die, info, option, rmtree, setenv, sh, task, warn
+from path import Path
 
 defaults = config(
     name="{spin.project_name}",
@@ -31,6 +33,13 @@ defaults = config(
     caddok_package_server_index_url=None,
     caddok_package_server="",
     dbms="sqlite",  # Default backend for development
+    parallel=config(
+        jobs=2,
+        patterns=["test_*.py", "*_test.py"],
+        directory="{spin.spin_dir}/csspin_ce/pkgtest",
+        durations="{spin.spin_dir}/csspin_ce/pkgtest_durations.json",
+        junit="{spin.project_root}/pkgtest-results.xml",
+    ),
     requires=config(
         spin=[
             "csspin_ce.contact_elements",
@@ -42,15 +51,34 @@ defaults = config(
 
 
 @task()
-def pkgtest(
+def pkgtest(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     cfg,
     args,
     dbms: option(
         "--dbms", is_flag=False, help="Override default dbms"  # noqa: F821, F722
     ),
+    matrix: option(
+        "--matrix",  # noqa: F821
+        help=(
+            "Test the package against the comma-separated DBMS"  # noqa: F722
+            " concurrently."  # noqa: F722
+        ),
+    ),
+    shards: option(
+        "--shards",  # noqa: F821
+        type=int,
+        default=1,
+        show_default=True,
+        help="Split the tests into this number of concurrent shards.",  # noqa: F722
+    ),
 ):
     """
     Run the CLI took 'pkgtest'.
+
+    Using --matrix and --shards, several pkgtest runs are started
+    concurrently, one per DBMS and shard of the tests, each writing its
+    output into a log file of its own. Their JUnit reports are merged into
+    one.
     """
     opts = cfg.pkgtest.opts
 
@@ -67,8 +95,6 @@ def pkgtest(
         )
     if cfg.pkgtest.caddok_package_server:
         opts.extend(["--caddok-package-server", cfg.pkgtest.caddok_package_server])
-    if cfg.pkgtest.tests:
-        opts.extend(["--tests", cfg.pkgtest.tests])
     if cfg.pkgtest.test_command:
         opts.extend(["--test-command", cfg.pkgtest.test_command])
 
@@ -92,6 +118,12 @@ def pkgtest(
         CADDOK_BASE=None
     )  # Unset CADDOK_BASE here so mkinstance call in pkgtest script doesn't fail
 
+    if matrix or shards > 1:
+        _run_parallel(
+            cfg, wheel, (matrix or dbms or cfg.pkgtest.dbms).split(","), shards, args
+        )
+        return
+
     sh(
         "pkgtest",
         "whl",
@@ -101,6 +133,80 @@ def pkgtest(
         cfg.python.python,
         "--dbms",
         dbms or cfg.pkgtest.dbms,
+        *(["--tests", cfg.pkgtest.tests] if cfg.pkgtest.tests else []),
         *cfg.pkgtest.opts,
         *args,
     )
+
+
+def _run_parallel(cfg, wheel, dbmss, shards, args):  # pylint: disable=too-many-locals
+    """
+    Run pkgtest for each DBMS in ``dbmss`` and each of ``shards`` shards of
+    the tests on ``pkgtest.parallel.jobs`` threads, merging their JUnit
+    reports into ``pkgtest.parallel.junit``.
+    """
+    import time
+
+    from csspin_ce import _shards
+    from csspin_ce._matrix import report, run_matrix
+
+    parallel = cfg.pkgtest.parallel
+    directory = Path(parallel.directory)
+    rmtree(directory)
+
+    tests = Path(cfg.pkgtest.tests).absolute() if cfg.pkgtest.tests else None
+    files = (
+        _shards.collect(tests, parallel.patterns) if tests and tests.is_dir() else []
+    )
+    partitions = [None]
+    if shards > 1:
+        if not files:
+            die(f"There are no tests matching {parallel.patterns} to shard.")
+        partitions = _shards.balance(
+            files, _shards.read_durations(parallel.durations), shards
+        )
+
+    commands = {}
+    for dbms in dbmss:
+        for index, shard in enumerate(partitions):
+            run = dbms if shard is None else f"{dbms}-{index}"
+            rundir = directory / run
+            (rundir / "junit").makedirs_p()
+            cmd = ["pkgtest", "whl", cfg.pkgtest.name, wheel]
+            cmd += ["--python", cfg.python.python, "--dbms", dbms]
+            if tests:
+                cmd += ["--tests", tests]
+            # Pytest based tests write their JUnit report into the run's
+            # directory, test commands may write theirs there as well.
+            addopts = [
+                os.environ.get("PYTEST_ADDOPTS", ""),
+                *_shards.junit_options(rundir / "junit" / "pytest.xml"),
+            ]
+            if shard is not None:
+                addopts += _shards.ignore_options(tests, files, shard)
+            commands[run] = (
+                [*cmd, *cfg.pkgtest.opts, *args],
+                rundir / "pkgtest.log",
+                {
+                    "CSSPIN_CE_JUNIT_DIRECTORY": str(rundir / "junit"),
+                    "PYTEST_ADDOPTS": " ".join(filter(None, addopts)),
+                },
+            )
+
+    started = time.monotonic()
+    with cfg.spin.subprocess_environment():
+        results = run_matrix(commands, int(parallel.jobs))
+    succeeded = report(results, started)
+
+    reports = {run: (directory / run / "junit").files("*.xml") for run in commands}
+    _shards.record_durations(
+        parallel.durations,
+        [path for paths in reports.values() for path in paths],
+        files,
+    )
+    _shards.merge_junit(reports, parallel.junit)
+    info(f"Merged the JUnit reports into {parallel.junit}")
+    if not any(reports.values()):
+        warn("The tests didn't write any JUnit report.")
+    if not succeeded:
+        die("pkgtest failed for some DBMS or shards.")
@@ -13,6 +13,8 @@ import subprocess
 import sys
 
 import pytest
+from csspin import Verbosity, config, get_tree, set_tree
+from path import Path
 
 
 @pytest.fixture
@@ -27,6 +29,57 @@ def short_tmp_path(tmp_path_factory, request):
     return base
 
 
+@pytest.fixture
+def cfg(tmp_path):
+    """
+    Install a minimal configuration tree, so that the functions of csspin
+    reporting to the console can be used in unit tests.
+    """
+    old_tree = get_tree()
+    tree = set_tree(
+        config(
+            verbosity=Verbosity.NORMAL,
+            spin=config(data=tmp_path / "data", spin_dir=tmp_path / ".spin"),
+        )
+    )
+    yield tree
+    set_tree(old_tree)
+
+
+@pytest.fixture
+def ce_cfg(cfg, tmp_path):  # pylint: disable=redefined-outer-name
+    """
+    Extend the minimal configuration tree by the settings of csspin-ce used
+    for provisioning and building instances, storing everything in the
+    temporary directory, e.g. a download cache of one megabyte.
+    """
+    # pylint: disable=protected-access
+    from csspin_ce import _cache, _trace
+
+    tmp_path = Path(tmp_path)
+    cfg.contact_elements = config(
+        cache=config(directory=tmp_path / "cache", max_size=1),
+        download=config(
+            retries=3,
+            segments=1,
+            min_segment_size=1,
+            timeout=10,
+            probe_timeout=2,
+            mirror_ttl=3600,
+        ),
+        extract=config(workers=2),
+        manifest=config(file=tmp_path / "manifest.json", verify=False),
+        trace=tmp_path / "trace.json",
+    )
+    cfg.mkinstance = config(
+        snapshots=config(directory=tmp_path / "snapshots", keep=2),
+        mutable=["*.db", "etc"],
+    )
+    _cache._IN_USE.clear()
+    _trace._EVENTS.clear()
+    return cfg
+
+
 @pytest.fixture
 def execute_spin():
     """Fixture to execute spin commands in integration tests."""
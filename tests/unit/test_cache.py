@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the download cache of csspin-ce"""
+
+import hashlib
+import os
+import tarfile
+from unittest.mock import patch
+
+import pytest
+from click import Abort
+from path import Path
+
+from csspin_ce import _cache
+
+
+def fake_download(size):
+    """Create a replacement for csspin.download writing ``size`` bytes."""
+
+    def _download(cfg, url, location):  # pylint: disable=unused-argument
+        Path(location).dirname().makedirs_p()
+        with open(location, "wb") as fd:
+            fd.write(url.encode().ljust(size, b"\0"))
+
+    return _download
+
+
+def test_fetch_downloads_once(ce_cfg):
+    """Fetching the same URL twice hits the network only once."""
+    url = "https://example.com/solr-9.10.1-slim.tgz"
+    with patch.object(_cache, "download", side_effect=fake_download(10)) as download:
+        first = _cache.fetch(ce_cfg, url)
+        second = _cache.fetch(ce_cfg, url)
+
+    download.assert_called_once()
+    assert first == second
+    assert first.basename() == "solr-9.10.1-slim.tgz"
+    assert first.dirname().basename() == hashlib.sha256(first.read_bytes()).hexdigest()
+
+
+def test_fetch_verifies_checksum(ce_cfg):
+    """An archive not matching the expected sha256 is rejected."""
+    with (
+        patch.object(_cache, "download", side_effect=fake_download(10)),
+        pytest.raises(Abort),
+    ):
+        _cache.fetch(ce_cfg, "https://example.com/a.zip", sha256="0" * 64)
+
+    assert not _cache.lookup(ce_cfg, "https://example.com/a.zip")
+
+
+def test_evict_least_recently_used(ce_cfg):
+    """Archives are evicted in least recently used order."""
+    size = 400 * 1024
+    with patch.object(_cache, "download", side_effect=fake_download(size)):
+        old = _cache.fetch(ce_cfg, "https://example.com/old.zip")
+        used = _cache.fetch(ce_cfg, "https://example.com/used.zip")
+        os.utime(old, (0, 0))
+        os.utime(used, (1, 1))
+        _cache.lookup(ce_cfg, "https://example.com/used.zip")
+        _cache._IN_USE.clear()  # pylint: disable=protected-access
+        _cache.fetch(ce_cfg, "https://example.com/new.zip")
+
+    assert not _cache.lookup(ce_cfg, "https://example.com/old.zip")
+    assert _cache.lookup(ce_cfg, "https://example.com/used.zip")
+    assert _cache.lookup(ce_cfg, "https://example.com/new.zip")
+
+
+def test_bundle_roundtrip(ce_cfg, tmp_path):
+    """Archives imported from a bundle are fetched without downloading them."""
+    urls = [
+        "https://example.com/traefik.tar.gz",
+        "https://mirror-a.example.com/tika.jar",
+        "https://mirror-b.example.com/tika.jar",
+    ]
+    with patch.object(_cache, "download", side_effect=fake_download(10)):
+        artifacts = {url: _cache.fetch(ce_cfg, url) for url in urls[:2]}
+    artifacts[urls[2]] = artifacts[urls[1]]
+    _cache.export_bundle(ce_cfg, artifacts, bundle := Path(tmp_path) / "ce.bundle")
+
+    ce_cfg.contact_elements.cache.directory = Path(tmp_path) / "offline"
+    _cache._IN_USE.clear()  # pylint: disable=protected-access
+    assert _cache.import_bundle(ce_cfg, bundle) == urls
+
+    with patch.object(_cache, "download") as download:
+        for url in urls:
+            assert _cache.fetch(ce_cfg, url).read_bytes() == (
+                artifacts[url].read_bytes()
+            )
+    download.assert_not_called()
+
+
+def test_import_rejects_foreign_archives(ce_cfg, tmp_path):
+    """Only bundles written by export_bundle can be imported."""
+    with tarfile.open(bundle := Path(tmp_path) / "other.tar", "w") as tar:
+        tar.add(__file__, arcname="test_cache.py")
+
+    with pytest.raises(Abort):
+        _cache.import_bundle(ce_cfg, bundle)
@@ -17,14 +17,21 @@
 
 """Module implementing the unit tests for csspin-ce"""
 
+import sys
+from contextlib import nullcontext
 from unittest.mock import patch
 
 import pytest
+from click.exceptions import Abort
+from csspin import config
+from path import Path
 
 # ce_services calls _default_solr_version() at module level to populate
 # defaults.solr.version, so interpolate1 must be patched before the import.
 with patch("csspin.interpolate1", return_value="2026.3"):
     from csspin_ce import ce_services
+from csspin_ce._manifest import Manifest
+from csspin_ce._profile import jvm_settings
 
 
 @pytest.mark.parametrize(
@@ -45,3 +52,147 @@ def test_default_solr_version(umbrella, expected_version):
 
     mock_interpolate1.assert_called_once_with("{contact_elements.umbrella}")
     assert result == expected_version
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Erlang is prebuilt on Windows")
+def test_install_erlang_reuses_build(cfg, tmp_path):
+    """Erlang is compiled once, later installations unpack the cached build."""
+    tmp_path = Path(tmp_path)
+    cfg.contact_elements = config(
+        cache=config(directory=tmp_path / "cache", max_size=100),
+        manifest=config(file=tmp_path / "manifest.json", verify=False),
+    )
+    cfg.ce_services = config(
+        rabbitmq=config(
+            erlang=config(
+                version="28.0", install_dir=tmp_path / "erlang", build_cache=True
+            )
+        )
+    )
+    prefix = tmp_path / "erlang" / "28.0"
+
+    def compile_erlang(*args):
+        prefix = args[-1]
+        (prefix / "lib" / "erlang" / "bin").makedirs_p()
+        (prefix / "lib" / "erlang" / "bin" / "erl").write_text("#!/bin/sh")
+
+    install_erlang = ce_services._install_erlang  # pylint: disable=protected-access
+    with (
+        patch("csspin_ce._cache.fetch"),
+        patch.object(
+            ce_services, "_compile_erlang", side_effect=compile_erlang
+        ) as compile_mock,
+        patch.object(ce_services, "_relocate_erlang") as relocate,
+    ):
+        install_erlang(cfg, Manifest(cfg))
+        prefix.rmtree()
+        install_erlang(cfg, Manifest(cfg))
+        # The manifest records the installation as complete now.
+        install_erlang(cfg, Manifest(cfg))
+
+    compile_mock.assert_called_once()
+    # Both, the compiled and the unpacked build are relocated from their stage.
+    assert [call.args[2] for call in relocate.call_args_list] == [prefix, prefix]
+    assert (prefix / "lib" / "erlang" / "bin" / "erl").read_text() == "#!/bin/sh"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Erlang is prebuilt on Windows")
+def test_relocate_erlang_links(cfg, tmp_path):
+    """Absolute links into the build become relative, others are kept."""
+    location = Path(tmp_path) / "stage"
+    (location / "lib" / "erlang" / "bin").makedirs_p()
+    (location / "bin").makedirs_p()
+    (location / "lib" / "erlang" / "bin" / "erl").write_text("#!/bin/sh")
+    (location / "lib" / "erlang" / "bin" / "erl").symlink(location / "bin" / "erl")
+    Path("/usr/bin/escript").symlink(location / "bin" / "escript")
+
+    with patch.object(ce_services, "sh"):
+        ce_services._relocate_erlang(  # pylint: disable=protected-access
+            cfg, location, Path(tmp_path) / "erlang"
+        )
+
+    assert (location / "bin" / "erl").readlink() == "../lib/erlang/bin/erl"
+    assert (location / "bin" / "erl").read_text() == "#!/bin/sh"
+    assert (location / "bin" / "escript").readlink() == "/usr/bin/escript"
+
+
+@pytest.mark.parametrize(
+    "profile, memory, solr_heap, processors",
+    [
+        ("ci", 16, 1365, 2),
+        ("dev", 16, 2730, 4),
+        ("perf", 16, 5461, 8),
+        ("ci", 1, 256, 2),
+    ],
+)
+def test_jvm_settings(profile, memory, solr_heap, processors):
+    """The JVMs are sized by the profile, the host's memory and processors."""
+    settings = jvm_settings(
+        profile, ["solr", "redis", "tika", "hivemq"], memory * 2**30, 8
+    )
+
+    assert list(settings) == ["solr", "hivemq"]
+    assert settings["solr"]["heap"] == solr_heap
+    assert settings["hivemq"]["heap"] == max(256, solr_heap // 2)
+    assert settings["solr"]["processors"] == processors
+
+
+def test_apply_profile_keeps_environment(cfg, monkeypatch):
+    """Environment variables set by the user take precedence over the profile."""
+    cfg.contact_elements = config(umbrella="2026.2")
+    cfg.ce_services = config(
+        profile="ci",
+        hivemq=config(enabled=True),
+        influxdb=config(enabled=False),
+        rabbitmq=config(enabled=False),
+    )
+    for name in ("SOLR_HEAP", "GC_TUNE", "SOLR_OPTS", "JAVA_OPTS", "JAVA_TOOL_OPTIONS"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("SOLR_HEAP", "3g")
+
+    with (
+        patch("csspin_ce._profile.host_memory", return_value=16 * 2**30),
+        patch("csspin_ce._profile.host_processors", return_value=8),
+        patch.object(ce_services, "setenv") as setenv,
+    ):
+        ce_services._apply_profile(cfg)  # pylint: disable=protected-access
+
+    variables = {k: v for call in setenv.call_args_list for k, v in call.kwargs.items()}
+    assert "SOLR_HEAP" not in variables
+    assert variables["GC_TUNE"] == "-XX:+UseSerialGC"
+    assert variables["JAVA_OPTS"].startswith("-Xms682m -Xmx682m -XX:+UseSerialGC")
+    assert "JAVA_TOOL_OPTIONS" not in variables
+
+
+def test_init_checks_hivemq_integration(cfg, tmp_path):
+    """A missing HiveMQ integration is detected, even if the environment is cached."""
+    cfg.contact_elements = config(umbrella="2026.2")
+    cfg.mkinstance = config(base=config(instance_location=Path(tmp_path) / "inst"))
+    cfg.ce_services = config(
+        solr=config(use=None),
+        hivemq=config(
+            enabled=True,
+            elements_integration=config(install_dir=Path(tmp_path) / "missing"),
+        ),
+    )
+
+    with (
+        patch.object(ce_services, "cached_environment", return_value={"PATH": ""}),
+        patch.object(ce_services, "setenv"),
+        pytest.raises(Abort),
+    ):
+        ce_services.init(cfg)
+
+
+def test_sampler_without_psutil(cfg):
+    """Without psutil in spin's environment, the services aren't sampled."""
+    cfg.ce_services = config(sampler=config(enabled=True))
+
+    with (
+        patch.dict(sys.modules, {"psutil": None}),
+        patch.object(ce_services, "warn") as warn,
+    ):
+        sampler = ce_services._sampler(cfg)  # pylint: disable=protected-access
+
+    assert isinstance(sampler, nullcontext)
+    warn.assert_called_once()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the resumable downloads of csspin-ce"""
+
+import io
+import os
+import re
+import socket
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from path import Path
+
+from csspin_ce import _cache, _download
+from csspin_ce._download import download, forget_mirror, rank_mirrors
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 17)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves a payload, honoring range requests like a static file server."""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """Answer with the size of the payload only."""
+        self.server.probes.append(self.path)
+        if self.path.startswith("/missing/"):
+            self.send_error(404)
+            return
+        if self.path.startswith("/broken/"):
+            self.send_error(503)
+            return
+        if self.path.startswith("/nohead/"):
+            self.send_error(405)
+            return
+        if self.path.startswith("/slow/"):
+            time.sleep(0.2)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.server.payload)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send the requested range of the payload."""
+        self.server.ranges.append(self.headers.get("Range"))
+        payload = self.server.payload
+        first, last = 0, len(payload) - 1
+        if match := re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or ""):
+            first = int(match.group(1))
+            last = int(match.group(2)) if match.group(2) else last
+            if first >= len(payload):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(payload)}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(payload)}")
+        else:
+            self.send_response(200)
+        body = payload[first : last + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.drop_after:
+            # Simulate a dropped connection in the middle of the transfer.
+            body = body[: self.server.drop_after]
+            self.server.drop_after = 0
+        self.wfile.write(body)
+
+
+@pytest.fixture(name="server")
+def fixture_server():
+    """Local stand-in for a download server supporting range requests."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.payload = PAYLOAD
+    httpd.ranges = []
+    httpd.probes = []
+    httpd.drop_after = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url_of(server):
+    """The URL of the payload served by ``server``."""
+    return f"http://127.0.0.1:{server.server_address[1]}/solr.tgz"
+
+
+def test_download(ce_cfg, server, tmp_path):
+    """A file is downloaded in a single request."""
+    download(ce_cfg, url_of(server), location := Path(tmp_path) / "solr.tgz")
+
+    assert location.read_bytes() == PAYLOAD
+    assert server.ranges == [None]
+
+
+def test_download_resumes_partial_file(ce_cfg, server, tmp_path):
+    """An existing partial download is continued via a range request."""
+    (location := Path(tmp_path) / "solr.tgz").write_bytes(PAYLOAD[:1000])
+    download(ce_cfg, url_of(server), location)
+
+    assert location.read_bytes() == PAYLOAD
+    assert server.ranges == ["bytes=1000-"]
+
+
+def test_download_resumes_dropped_connection(ce_cfg, server, tmp_path):
+    """A dropped connection is resumed where it stopped."""
+    server.drop_after = 1024 * 1024
+    download(ce_cfg, url_of(server), location := Path(tmp_path) / "solr.tgz")
+
+    assert location.read_bytes() == PAYLOAD
+    assert server.ranges == [None, f"bytes={1024 * 1024}-"]
+
+
+def test_download_segmented(ce_cfg, server, tmp_path):
+    """Large files are fetched in concurrent byte ranges and reassembled."""
+    ce_cfg.contact_elements.download.segments = 3
+    download(ce_cfg, url_of(server), location := Path(tmp_path) / "solr.tgz")
+
+    assert location.read_bytes() == PAYLOAD
+    assert len(server.ranges) == 3
+    assert all(rng.startswith("bytes=") for rng in server.ranges)
+    assert not list(Path(tmp_path).files("solr.tgz.*"))
+
+
+def test_download_too_small_for_segments(ce_cfg, server, tmp_path):
+    """Files smaller than the minimum segment size are fetched at once."""
+    ce_cfg.contact_elements.download.segments = 4
+    download(ce_cfg, url_of(server), location := Path(tmp_path) / "solr.tgz")
+
+    assert location.read_bytes() == PAYLOAD
+    assert server.ranges == [None]
+
+
+def test_rank_mirrors(ce_cfg, server, tmp_path):
+    """Mirrors are ranked by latency, skipping those lacking the file."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        unreachable = f"http://127.0.0.1:{sock.getsockname()[1]}/solr.tgz"
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [
+        f"{base}/slow/solr.tgz",
+        f"{base}/missing/solr.tgz",
+        unreachable,
+        f"{base}/fast/solr.tgz",
+    ]
+    ranking_file = Path(tmp_path) / "mirrors.json"
+
+    expected = [f"{base}/fast/solr.tgz", f"{base}/slow/solr.tgz"]
+    assert rank_mirrors(ce_cfg, urls, ranking_file) == expected
+    assert len(server.probes) == 3
+
+    # The available mirrors are remembered until they are forgotten, while
+    # the others are probed again.
+    assert rank_mirrors(ce_cfg, urls, ranking_file) == expected
+    assert server.probes[3:] == ["/missing/solr.tgz"]
+    forget_mirror(ranking_file, f"{base}/fast/solr.tgz")
+    rank_mirrors(ce_cfg, urls, ranking_file)
+    assert sorted(server.probes[4:]) == ["/fast/solr.tgz", "/missing/solr.tgz"]
+
+
+def test_rank_mirrors_by_status(ce_cfg, server, tmp_path):
+    """Mirrors refusing HEAD requests are available, failing ones aren't."""
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/broken/solr.tgz", f"{base}/nohead/solr.tgz"]
+
+    assert rank_mirrors(ce_cfg, urls, Path(tmp_path) / "mirrors.json") == [
+        f"{base}/nohead/solr.tgz"
+    ]
+
+
+def test_fetch_first_without_available_mirrors(ce_cfg, server, monkeypatch):
+    """If no mirror answers the probes, they are tried in their order."""
+    monkeypatch.setattr(_download, "_probe", lambda cfg, url: None)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/first/solr.tgz", f"{base}/second/solr.tgz"]
+
+    url, archive = _cache.fetch_first(ce_cfg, urls, "Solr")
+
+    assert url == urls[0]
+    assert archive.read_bytes() == PAYLOAD
+
+
+def make_tgz(files):
+    """Create a gzip compressed tar archive containing ``files``."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def test_fetch_extracts_while_downloading(ce_cfg, server, tmp_path):
+    """Tar archives are unpacked in the same pass as they are downloaded."""
+    server.payload = make_tgz({"solr-9/bin/solr": PAYLOAD, "docs/index.html": b"x"})
+    target = Path(tmp_path) / "install"
+
+    archive = _cache.fetch(ce_cfg, url_of(server), extract_to=target, member="solr-9")
+
+    assert (target / "solr-9" / "bin" / "solr").read_bytes() == PAYLOAD
+    assert not (target / "docs").exists()
+    assert archive.read_bytes() == server.payload
+    assert server.ranges == [None]
+
+
+def test_fetch_extract_resumes_dropped_connection(ce_cfg, server, tmp_path):
+    """A download dropped while unpacking is resumed and unpacked afterwards."""
+    server.payload = make_tgz({"solr-9/bin/solr": PAYLOAD})
+    server.drop_after = 1024 * 1024
+    target = Path(tmp_path) / "install"
+
+    archive = _cache.fetch(ce_cfg, url_of(server), extract_to=target, member="solr-9")
+
+    assert (target / "solr-9" / "bin" / "solr").read_bytes() == PAYLOAD
+    assert archive.read_bytes() == server.payload
+    assert server.ranges == [None, f"bytes={1024 * 1024}-"]
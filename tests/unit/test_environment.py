@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the init environment cache of csspin-ce"""
+
+from unittest.mock import Mock
+
+from path import Path
+
+from csspin_ce._environment import cached_environment, invalidate_environment
+
+
+def test_environment_is_cached_per_configuration(cfg):
+    """The environment is computed again for other keys and after provisioning."""
+    compute = Mock(return_value={"PATH": Path("/data/traefik/2.11.2")})
+
+    first = cached_environment(cfg, "ce_services", {"version": "2.11.2"}, compute)
+    second = cached_environment(cfg, "ce_services", {"version": "2.11.2"}, compute)
+    assert first == second == {"PATH": "/data/traefik/2.11.2"}
+    assert compute.call_count == 1
+
+    cached_environment(cfg, "mkinstance", {"version": "2.11.2"}, compute)
+    cached_environment(cfg, "ce_services", {"version": "3.0.0"}, compute)
+    assert compute.call_count == 3
+
+    invalidate_environment(cfg)
+    cached_environment(cfg, "ce_services", {"version": "3.0.0"}, compute)
+    assert compute.call_count == 4
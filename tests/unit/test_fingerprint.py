@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the source fingerprints of csspin-ce"""
+
+import os
+import subprocess  # nosec: import_subprocess
+
+import pytest
+from path import Path
+
+from csspin_ce._fingerprint import record, recorded, source_files, sources_fingerprint
+
+
+def make_project(root):
+    """Create a project with frontend sources, an instance and node_modules."""
+    (root / "cs" / "app" / "js").makedirs_p()
+    (root / "cs" / "app" / "js" / "index.js").write_text("export {};")
+    (root / "cs" / "app" / "main.py").write_text("")
+    (root / "package.json").write_text("{}")
+    (root / "node_modules" / "react").makedirs_p()
+    (root / "node_modules" / "react" / "index.js").write_text("")
+    record(root / "sqlite", "webmake", "0" * 64)
+
+
+@pytest.mark.usefixtures("cfg")
+def test_source_files(tmp_path):
+    """Instances and excluded directories are left out."""
+    make_project(root := Path(tmp_path))
+
+    assert source_files(root, ["node_modules"]) == [
+        "cs/app/js/index.js",
+        "cs/app/main.py",
+        "package.json",
+    ]
+
+
+@pytest.mark.usefixtures("cfg")
+def test_source_files_of_git_repository(tmp_path):
+    """The files ignored by git are left out."""
+    make_project(root := Path(tmp_path))
+    (root / ".gitignore").write_text("/node_modules/\n/sqlite/\n")
+    subprocess.run(["git", "init", "-q", root], check=True)  # nosec
+    subprocess.run(["git", "-C", root, "add", "cs"], check=True)  # nosec
+
+    assert source_files(root, []) == [
+        ".gitignore",
+        "cs/app/js/index.js",
+        "cs/app/main.py",
+        "package.json",
+    ]
+
+
+@pytest.mark.usefixtures("cfg")
+def test_source_files_of_git_repository_with_instance(tmp_path):
+    """Instances are left out, even if they aren't ignored by git."""
+    make_project(root := Path(tmp_path))
+    (root / "sqlite" / "etc").makedirs_p()
+    (root / "sqlite" / "etc" / "dbtab").write_text("")
+    (root / ".gitignore").write_text("/node_modules/\n")
+    subprocess.run(["git", "init", "-q", root], check=True)  # nosec
+
+    assert source_files(root, []) == [
+        ".gitignore",
+        "cs/app/js/index.js",
+        "cs/app/main.py",
+        "package.json",
+    ]
+
+
+@pytest.mark.usefixtures("cfg")
+def test_sources_fingerprint(tmp_path):
+    """The fingerprint only changes along with the files matching the patterns."""
+    make_project(root := Path(tmp_path))
+    patterns = ["*package.json", "*/js/*"]
+
+    def fingerprint():
+        return sources_fingerprint(
+            root, source_files(root, ["node_modules"]), patterns, packages=[]
+        )
+
+    before = fingerprint()
+    (root / "cs" / "app" / "main.py").write_text("import os")
+    assert fingerprint() == before
+    (root / "cs" / "app" / "js" / "index.js").write_text("export default {};")
+    os.utime(root / "cs" / "app" / "js" / "index.js", ns=(0, 0))
+    assert fingerprint() != before
+
+
+@pytest.mark.usefixtures("cfg")
+def test_record(tmp_path):
+    """The fingerprints are recorded per step."""
+    record(instancedir := Path(tmp_path) / "sqlite", "webmake", "a" * 64)
+    record(instancedir, "cdbpkg", "b" * 64)
+    record(instancedir, "webmake", "c" * 64)
+
+    assert recorded(instancedir) == {"webmake": "c" * 64, "cdbpkg": "b" * 64}
+    assert not recorded(Path(tmp_path) / "postgres")
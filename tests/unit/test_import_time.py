@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the load time of the csspin-ce plugins"""
+
+import subprocess  # nosec: import_subprocess
+import sys
+
+import pytest
+
+#: The plugin modules, which spin imports for every command.
+PLUGINS = (
+    "csspin_ce.ce_services",
+    "csspin_ce.ce_support_tools",
+    "csspin_ce.contact_elements",
+    "csspin_ce.localization",
+    "csspin_ce.mkinstance",
+    "csspin_ce.pkgtest",
+)
+
+#: Modules only needed by some tasks, which must not be imported by loading
+#: the plugins.
+LAZY = (
+    "concurrent.futures",
+    "getpass",
+    "csspin_ce._cache",
+    "csspin_ce._download",
+    "csspin_ce._jobs",
+    "csspin_ce._manifest",
+    "csspin_ce._matrix",
+    "csspin_ce._ports",
+    "csspin_ce._profile",
+    "csspin_ce._readiness",
+    "csspin_ce._sampler",
+    "csspin_ce._shards",
+    "csspin_ce._snapshot",
+    "csspin_ce._supervisor",
+    "csspin_ce._trash",
+)
+
+
+def _import_times():
+    """
+    Import the plugins in a fresh interpreter after spin itself, returning
+    the cumulative import time in microseconds of each module imported by
+    loading the plugins.
+    """
+    # Tasks with hooks require the configuration tree spin installs first.
+    code = (
+        "import sys, csspin, csspin.cli;"
+        " csspin.set_tree(csspin.config(spin=csspin.config()));"
+        " sys.stderr.write('--\\n');"
+        f" import {', '.join(PLUGINS)}"
+    )
+    result = subprocess.run(  # nosec: subprocess_without_shell_equals_true
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    lines = result.stderr.splitlines()
+    for line in lines[lines.index("--") + 1 :]:
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.benchmark
+def test_benchmark_plugin_import_time(record_property):
+    """Loading the plugins doesn't import the modules only some tasks need."""
+    times = _import_times()
+
+    assert set(PLUGINS) <= set(times)
+    assert not set(LAZY) & set(times)
+    for plugin in PLUGINS:
+        record_property(f"import_{plugin}", f"{times[plugin] / 1000:.1f}ms")
+    record_property(
+        "import_csspin_ce", f"{sum(times[plugin] for plugin in PLUGINS) / 1000:.1f}ms"
+    )
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the job graph of csspin-ce"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+from click import Abort
+
+from csspin_ce._jobs import run_jobs
+
+
+@pytest.mark.usefixtures("cfg")
+def test_run_jobs_respects_requirements():
+    """Jobs start only after their requirements succeeded."""
+    order = []
+    jobs = {
+        "rabbitmq": (lambda: order.append("rabbitmq"), ("erlang",)),
+        "erlang": (lambda: order.append("erlang"), ()),
+        "traefik": (lambda: order.append("traefik"), ()),
+    }
+    run_jobs(jobs, max_workers=4)
+
+    assert sorted(order) == ["erlang", "rabbitmq", "traefik"]
+    assert order.index("erlang") < order.index("rabbitmq")
+
+
+@pytest.mark.usefixtures("cfg")
+def test_run_jobs_runs_concurrently():
+    """Independent jobs run at the same time."""
+    barrier = threading.Barrier(2, timeout=5)
+    run_jobs({"solr": (barrier.wait, ()), "tika": (barrier.wait, ())}, max_workers=2)
+
+
+@pytest.mark.usefixtures("cfg")
+def test_run_jobs_reports_failures_per_job():
+    """A failing job skips its dependents, but not the independent jobs."""
+    done = []
+
+    def fail():
+        raise RuntimeError("download failed")
+
+    jobs = {
+        "erlang": (fail, ()),
+        "rabbitmq": (lambda: done.append("rabbitmq"), ("erlang",)),
+        "traefik": (lambda: done.append("traefik"), ()),
+    }
+    with (
+        patch("csspin_ce._jobs.error") as error,
+        pytest.raises(Abort, match="erlang, rabbitmq"),
+    ):
+        run_jobs(jobs, max_workers=2)
+
+    assert done == ["traefik"]
+    reported = [call.args[0] for call in error.call_args_list]
+    assert "erlang: download failed" in reported
+    assert any(msg.startswith("rabbitmq: skipped") for msg in reported)
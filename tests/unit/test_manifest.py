@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the provisioning manifest of csspin-ce"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from path import Path
+
+from csspin_ce._manifest import Manifest
+
+
+def install(path):
+    """Simulate the installation of a tool at ``path``."""
+    (path / "bin").makedirs_p()
+    (path / "bin" / "solr").write_text("#!/bin/sh")
+
+
+def test_manifest_records_installation(ce_cfg, tmp_path):
+    """Recorded installations are found by later runs."""
+    install(solr := Path(tmp_path) / "solr-9.10.1")
+    Manifest(ce_cfg).record(
+        "solr",
+        "9.10.1",
+        solr,
+        "https://x/solr.tgz",
+        archive="/cache/objects/abc/solr.tgz",
+    )
+
+    manifest = Manifest(ce_cfg)
+    assert manifest.installed("solr", "9.10.1", solr)
+    assert not manifest.installed("solr", "9.10.2", Path(tmp_path) / "solr-9.10.2")
+
+    entry = json.loads(manifest.file.read_text())[str(solr)]
+    assert entry["url"] == "https://x/solr.tgz"
+    assert entry["sha256"] == "abc"
+
+
+def test_manifest_replaces_partial_installation(ce_cfg, tmp_path):
+    """Installations that were never recorded are replaced."""
+    install(solr := Path(tmp_path) / "solr-9.10.1")
+    (solr / "bin" / "solr").write_text("")
+
+    def build(target):
+        install(target)
+        return "https://x/solr.tgz", None
+
+    manifest = Manifest(ce_cfg)
+    assert not manifest.installed("solr", "9.10.1", solr)
+    assert manifest.install("solr", "9.10.1", solr, build)
+    assert (solr / "bin" / "solr").read_text() == "#!/bin/sh"
+    assert Path(tmp_path).dirs(".solr-9.10.1.stage-*") == []
+
+
+def test_manifest_installs_once(ce_cfg, tmp_path):
+    """Concurrent installations of the same location build it only once."""
+    solr = Path(tmp_path) / "solr-9.10.1"
+    builds = []
+
+    def build(target):
+        builds.append(target)
+        time.sleep(0.1)
+        install(target)
+        return "https://x/solr.tgz", None
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda _: Manifest(ce_cfg).install("solr", "9.10.1", solr, build),
+                range(4),
+            )
+        )
+
+    assert sorted(results) == [False, False, False, True]
+    assert len(builds) == 1
+    assert Manifest(ce_cfg).installed("solr", "9.10.1", solr)
+
+
+def test_manifest_verifies_fingerprint(ce_cfg, tmp_path):
+    """Corrupted installations are detected when verifying is enabled."""
+    install(solr := Path(tmp_path) / "solr-9.10.1")
+    Manifest(ce_cfg).record("solr", "9.10.1", solr, "https://x/solr.tgz")
+    (solr / "bin" / "solr").write_text("")
+
+    assert Manifest(ce_cfg).installed("solr", "9.10.1", solr)
+
+    ce_cfg.contact_elements.manifest.verify = True
+    assert not Manifest(ce_cfg).installed("solr", "9.10.1", solr)
+
+
+def test_manifest_merges_concurrent_records(ce_cfg, tmp_path):
+    """Manifests of several processes don't lose each other's entries."""
+    tools = [Path(tmp_path) / f"tool-{index}" for index in range(8)]
+    for tool in tools:
+        install(tool)
+
+    # Each manifest stands for another process, not sharing the thread lock.
+    with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+        list(
+            executor.map(
+                lambda tool: Manifest(ce_cfg).record("tool", "1", tool, "https://x"),
+                tools,
+            )
+        )
+
+    manifest = Manifest(ce_cfg)
+    assert all(manifest.installed("tool", "1", tool) for tool in tools)
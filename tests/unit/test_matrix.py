@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the matrix runner of csspin-ce"""
+
+import sys
+import time
+
+import pytest
+from path import Path
+
+from csspin_ce._matrix import report, run_matrix
+
+
+@pytest.mark.usefixtures("cfg")
+def test_run_matrix(tmp_path):
+    """The commands run concurrently, each one logging into its own file."""
+    logs = Path(tmp_path) / "logs"
+    script = "import sys, time; time.sleep(0.5); print(sys.argv[1]); sys.exit({})"
+    commands = {
+        dbms: (
+            [sys.executable, "-c", script.format(exit_code), dbms],
+            logs / f"{dbms}.log",
+        )
+        for dbms, exit_code in (("sqlite", 0), ("postgres", 0), ("mssql", 3))
+    }
+
+    started = time.monotonic()
+    results = run_matrix(commands, 3)
+
+    assert time.monotonic() - started < 1.5
+    assert {dbms: result["returncode"] for dbms, result in results.items()} == {
+        "sqlite": 0,
+        "postgres": 0,
+        "mssql": 3,
+    }
+    assert (logs / "postgres.log").read_text().strip() == "postgres"
+    assert not report(results, started)
+    assert report({"sqlite": results["sqlite"]}, started)
+
+
+@pytest.mark.usefixtures("cfg")
+def test_run_matrix_environment(tmp_path):
+    """Commands may set environment variables of their own."""
+    logs = Path(tmp_path) / "logs"
+    script = "import os; print(os.environ['SHARD'])"
+    commands = {
+        f"sqlite-{index}": (
+            [sys.executable, "-c", script],
+            logs / f"{index}.log",
+            {"SHARD": str(index)},
+        )
+        for index in range(2)
+    }
+
+    results = run_matrix(commands, 2)
+
+    assert [results[name]["returncode"] for name in commands] == [0, 0]
+    assert (logs / "1.log").read_text().strip() == "1"
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the mkinstance plugin of csspin-ce"""
+
+import os
+import stat
+import sys
+from unittest.mock import patch
+
+import pytest
+from click.exceptions import Abort
+from csspin import config
+from path import Path
+
+from csspin_ce import mkinstance
+
+
+@pytest.mark.parametrize("linked", (False, True))
+def test_clone_instances(cfg, tmp_path, linked):
+    """The clones refer to their own location and database."""
+    project = Path(tmp_path) / "project"
+    project.makedirs_p()
+    if linked:
+        # The instance is configured and cloned by a symlinked location.
+        (Path(tmp_path) / "link").symlink_to(project)
+        project = Path(tmp_path) / "link"
+    source = project / "sqlite"
+    cfg.mkinstance = config(
+        base=config(instance_location=source),
+        mutable=["etc", "*.db"],
+        trash=Path(tmp_path) / "trash",
+    )
+    source_id = mkinstance._instance_id(source)  # pylint: disable=protected-access
+    (source / "etc").makedirs_p()
+    (source / "etc" / "dbtab").write_text(f"sqlite {source}/{source_id}.db")
+    (source / f"{source_id}.db").write_bytes(f"SQLite\0{source}".encode())
+    (source / "wheel.whl").write_text(str(source))
+
+    clone_instances = mkinstance._clone_instances  # pylint: disable=protected-access
+    # Cloning the resolved location still relocates the configured one.
+    clone_instances(cfg, source.realpath(), 2, rebuild=False)
+
+    for index in range(2):
+        clone = Path(f"{source}-{index}")
+        clone_id = mkinstance._instance_id(clone)  # pylint: disable=protected-access
+        assert (clone / "etc" / "dbtab").read_text() == f"sqlite {clone}/{clone_id}.db"
+        assert (clone / f"{clone_id}.db").read_bytes() == f"SQLite\0{source}".encode()
+        assert (clone / "wheel.whl").read_text() == str(source)
+    assert (source / "etc" / "dbtab").read_text() == f"sqlite {source}/{source_id}.db"
+
+    with pytest.raises(Abort):
+        clone_instances(cfg, source, 1, rebuild=False)
+    clone_instances(cfg, source, 1, rebuild=True)
+
+
+def test_refresh_runs_changed_steps(cfg, tmp_path):
+    """Only the steps whose sources changed are run again."""
+    cfg.spin.project_root = root = Path(tmp_path)
+    cfg.mkinstance = config(
+        webmake=True,
+        fingerprints=config(
+            webmake=["package.json"], cdbpkg=["*/configuration/*"], exclude=[]
+        ),
+    )
+    (root / "package.json").write_text("{}")
+    instancedir = root / "sqlite"
+    instancedir.makedirs_p()
+
+    def refresh(**kwargs):
+        _refresh = mkinstance._refresh  # pylint: disable=protected-access
+        with (
+            patch.object(mkinstance, "_installed_packages", return_value=[]),
+            patch.object(mkinstance, "sh") as sh,
+        ):
+            _refresh(cfg, instancedir, **kwargs)
+        return [call.args[0] for call in sh.call_args_list]
+
+    assert refresh(force=True) == ["webmake", "cdbpkg"]
+    assert not refresh()
+    os.utime(root / "package.json", ns=(0, 0))
+    assert refresh() == ["webmake"]
+
+
+def test_tls_cert_is_cached(cfg, tmp_path):
+    """Certificates are reused by instances until they near their expiry."""
+    x509 = pytest.importorskip("cryptography.x509")
+    cfg.mkinstance = config(
+        tls=config(
+            dns_names=["localhost", "build-host"],
+            key_type="ecdsa",
+            validity=365,
+            renew_before=30,
+            cache=Path(tmp_path) / "tls",
+        )
+    )
+    first, second = Path(tmp_path) / "first", Path(tmp_path) / "second"
+    first.makedirs_p()
+    second.makedirs_p()
+
+    create_tls_cert = mkinstance._create_tls_cert  # pylint: disable=protected-access
+    create_tls_cert(cfg, first)
+    create_tls_cert(cfg, second)
+    assert (first / "localhost.crt").read_bytes() == (
+        second / "localhost.crt"
+    ).read_bytes()
+    cert = x509.load_pem_x509_certificate((first / "localhost.crt").read_bytes())
+    assert cert.public_key().curve.name == "secp256r1"
+    if sys.platform != "win32":
+        assert stat.S_IMODE((second / "localhost.key").stat().st_mode) == 0o600
+
+    # The cache is keyed by the DNS names, regardless of their order.
+    cfg.mkinstance.tls.dns_names = ["build-host", "localhost"]
+    create_tls_cert(cfg, second)
+    assert (first / "localhost.crt").read_bytes() == (
+        second / "localhost.crt"
+    ).read_bytes()
+    assert len((Path(tmp_path) / "tls").dirs()) == 1
+
+    cfg.mkinstance.tls.renew_before = 366
+    create_tls_cert(cfg, second)
+    assert (first / "localhost.crt").read_bytes() != (
+        second / "localhost.crt"
+    ).read_bytes()
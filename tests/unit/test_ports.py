@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the port allocation of csspin-ce"""
+
+import json
+import socket
+from unittest.mock import patch
+
+import pytest
+from click.exceptions import Abort
+from path import Path
+
+from csspin_ce._ports import allocate_ports
+
+SERVICES = ["traefik", "solr", "redis", "tika", "traefik_dashboard"]
+
+
+def test_instances_get_distinct_ports(tmp_path):
+    """Instances get distinct ports and keep them while they are free."""
+    registry = Path(tmp_path) / "ports.json"
+    instances = [(Path(tmp_path) / f"inst{i}").mkdir() for i in range(3)]
+
+    allocated = [allocate_ports(registry, inst, SERVICES) for inst in instances]
+
+    ports = [port for by_service in allocated for port in by_service.values()]
+    assert len(set(ports)) == len(SERVICES) * len(instances)
+    assert allocate_ports(registry, instances[0], SERVICES) == allocated[0]
+    assert json.loads(registry.read_text())[str(instances[1])] == allocated[1]
+
+
+def test_busy_and_removed_ports(tmp_path):
+    """Ports in use are replaced, those of removed instances are released."""
+    registry = Path(tmp_path) / "ports.json"
+    first, second = (Path(tmp_path) / name for name in ("first", "second"))
+    first.mkdir()
+    second.mkdir()
+    ports = allocate_ports(registry, first, ["solr"])
+    allocate_ports(registry, second, ["solr"])
+
+    with socket.create_server(("", ports["solr"])):
+        assert allocate_ports(registry, first, ["solr"]) != ports
+
+    second.rmdir()
+    assert set(json.loads(registry.read_text())) == {str(first), str(second)}
+    allocate_ports(registry, first, ["solr"])
+    assert list(json.loads(registry.read_text())) == [str(first)]
+
+
+def test_no_free_ports(tmp_path):
+    """If no port can be bound, spin is aborted."""
+    with patch("csspin_ce._ports._bind", return_value=None), pytest.raises(Abort):
+        allocate_ports(Path(tmp_path) / "ports.json", tmp_path, ["solr"])
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the readiness probes of csspin-ce"""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from csspin_ce._readiness import probe, wait_until_ready
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answers each request with the status code given by its path."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send the status code requested."""
+        self.send_response(int(self.path.strip("/")))
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep the output of the tests clean."""
+
+
+@pytest.fixture(name="http_server")
+def fixture_http_server():
+    """An HTTP server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="redis_server")
+def fixture_redis_server():
+    """A server answering the first command of each connection with PONG."""
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            with conn:
+                conn.recv(64)
+                conn.sendall(b"+PONG\r\n")
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield f"redis://127.0.0.1:{listener.getsockname()[1]}"
+    listener.close()
+
+
+def free_port():
+    """A local port nobody listens on."""
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        return sock.getsockname()[1]
+
+
+def test_probe_http(http_server):
+    """Any response but a server error means the service is ready."""
+    assert probe(f"{http_server}/200")
+    assert probe(f"{http_server}/404")
+    assert not probe(f"{http_server}/503")
+    assert not probe(f"http://127.0.0.1:{free_port()}/")
+
+
+def test_probe_redis_and_tcp(redis_server):
+    """Redis must answer PING, a TCP service merely accept the connection."""
+    assert probe(redis_server)
+    assert probe(redis_server.replace("redis://", "tcp://"))
+    assert not probe(f"redis://127.0.0.1:{free_port()}")
+    assert not probe(f"tcp://127.0.0.1:{free_port()}")
+
+
+def test_wait_until_ready(http_server):
+    """The time to get ready is reported per service, None if it isn't."""
+    port = free_port()
+    listener = None
+
+    def start_later():
+        nonlocal listener
+        listener = socket.create_server(("127.0.0.1", port))
+
+    timer = threading.Timer(0.3, start_later)
+    timer.start()
+    try:
+        ready = wait_until_ready(
+            {
+                "solr": f"{http_server}/200",
+                "rabbitmq": f"tcp://127.0.0.1:{port}",
+                "influxdb": f"{http_server}/503",
+            },
+            timeout=2,
+        )
+    finally:
+        timer.join()
+        listener.close()
+
+    assert ready["solr"] < 0.3 <= ready["rabbitmq"] < 2
+    assert ready["influxdb"] is None
+
+
+def test_wait_until_ready_stops():
+    """Waiting ends as soon as the stop event is set."""
+    stop = threading.Event()
+    threading.Timer(0.1, stop.set).start()
+
+    ready = wait_until_ready({"redis": f"redis://127.0.0.1:{free_port()}"}, 60, stop)
+
+    assert ready == {"redis": None}
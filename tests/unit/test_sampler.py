@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the resource sampler of csspin-ce"""
+
+import json
+import os
+import subprocess  # nosec: import_subprocess
+import sys
+
+import pytest
+from path import Path
+
+from csspin_ce._sampler import Sampler, service_of
+
+
+@pytest.mark.parametrize(
+    "name,cmdline,service",
+    (
+        ("java", ["java", "-jar", "/tika/tika-server-standard-3.2.3.jar"], "tika"),
+        ("java", ["java", "-Dsolr.solr.home=/inst/solr", "start.jar"], "solr"),
+        ("beam.smp", ["/erlang/bin/beam.smp", "--", "-root"], "rabbitmq"),
+        ("redis-server", ["redis-server", "*:6379"], "redis"),
+        ("python", ["python", "-m", "gatekeeper"], "python"),
+        (
+            "java",
+            ["java", "-cp", "/h/lib/solr.jar", "-jar", "/h/bin/hivemq.jar"],
+            "hivemq",
+        ),
+        ("traefik", ["/data/traefik/traefik", "--configFile=/x/solr.yml"], "traefik"),
+        # The gatekeeper counts as a service of its own, despite its options.
+        ("python", ["python", "/venv/bin/ce_services", "--hivemq"], "ce_services"),
+        ("sh", ["/bin/sh", "-c", "ce_services --traefik_tls --solr"], "ce_services"),
+    ),
+)
+def test_service_of(name, cmdline, service):
+    """Processes are attributed to the services by their main programs."""
+    assert service_of(name, cmdline) == service
+
+
+def test_sampler_keeps_latest_samples(tmp_path):
+    """Samples are kept in a ring buffer, written to the file with a summary."""
+    psutil = pytest.importorskip("psutil")
+    file = Path(tmp_path) / "usage.json"
+    # A stand-in for the redis-server, recognized by the script it runs.
+    (redis_server := Path(tmp_path) / "redis-server").write_text(
+        "import time; time.sleep(60)"
+    )
+    with subprocess.Popen(  # nosec: subprocess_without_shell_equals_true
+        [sys.executable, redis_server]
+    ) as child:
+        try:
+            with Sampler(
+                psutil, os.getpid(), file, interval=0.01, capacity=3
+            ) as sampler:
+                for _ in range(5):
+                    sampler.sample()
+        finally:
+            child.kill()
+
+    written = json.loads(file.read_text())
+    assert len(written["time"]) == 3
+    redis = written["services"]["redis"]
+    assert redis["processes"][-1] == 1
+    assert redis["rss"][-1] > 0
+    assert written["summary"]["redis"]["max_threads"] >= 1
+    assert sampler.summary() == written["summary"]
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the test sharding of csspin-ce"""
+
+import shlex
+import xml.etree.ElementTree as ET  # nosec: import_xml_etree
+
+import pytest
+from path import Path
+
+from csspin_ce._shards import (
+    balance,
+    collect,
+    ignore_options,
+    junit_options,
+    merge_junit,
+    read_durations,
+    record_durations,
+)
+
+#: A JUnit report as written by pytest using the xunit1 family.
+REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" tests="{tests}" errors="0" failures="{failures}"
+             skipped="0" time="{time}">
+    {cases}
+  </testsuite>
+</testsuites>
+"""
+
+
+def write_report(path, cases, failures=0):
+    """Write a JUnit report of ``cases``, a list of files and durations."""
+    path.write_text(
+        REPORT.format(
+            tests=len(cases),
+            failures=failures,
+            time=sum(seconds for _, seconds in cases),
+            cases="\n".join(
+                f'<testcase classname="c" name="t{index}" file="{name}"'
+                f' time="{seconds}"/>'
+                for index, (name, seconds) in enumerate(cases)
+            ),
+        )
+    )
+    return path
+
+
+def test_balance():
+    """The shards take about the same time, unknown files the average."""
+    durations = {"test_a.py": 60, "test_b.py": 30, "test_c.py": 20, "test_d.py": 10}
+    files = [*durations, "test_e.py"]
+
+    shards = balance(files, durations, 2)
+
+    assert shards == [
+        ["test_a.py", "test_c.py"],
+        ["test_b.py", "test_d.py", "test_e.py"],
+    ]
+    assert balance(files, {}, 2) == [
+        ["test_a.py", "test_c.py", "test_e.py"],
+        ["test_b.py", "test_d.py"],
+    ]
+    assert balance(["test_a.py"], durations, 3) == [["test_a.py"]]
+
+
+def test_ignore_options(tmp_path):
+    """The test files of the other shards are ignored."""
+    tests = Path(tmp_path) / "accept tests"
+    (tests / "sub").makedirs_p()
+    for name in ("test_a.py", "sub/test_b.py", "sub/helpers.py", "conftest.py"):
+        (tests / name).write_text("")
+
+    files = collect(tests, ["test_*.py"])
+
+    assert files == ["sub/test_b.py", "test_a.py"]
+    assert shlex.split(" ".join(ignore_options(tests, files, ["test_a.py"]))) == [
+        f"--ignore={tests / 'sub' / 'test_b.py'}"
+    ]
+
+
+def test_junit_options(tmp_path):
+    """The path of the JUnit report may contain spaces."""
+    report = Path(tmp_path) / "pkg test" / "junit" / "pytest.xml"
+
+    assert shlex.split(" ".join(junit_options(report))) == [
+        f"--junitxml={report}",
+        "-o",
+        "junit_family=xunit1",
+    ]
+
+
+def test_record_durations(tmp_path):
+    """The durations are summed per file, taking the longest of all runs."""
+    store = Path(tmp_path) / "durations.json"
+    reports = [
+        write_report(
+            Path(tmp_path) / "sqlite.xml",
+            [("tests/test_a.py", 1.5), ("tests/test_a.py", 2), ("tests/test_b.py", 1)],
+        ),
+        write_report(Path(tmp_path) / "postgres.xml", [("tests/test_b.py", 4)]),
+    ]
+
+    record_durations(store, reports, ["test_a.py", "test_b.py", "test_c.py"])
+
+    assert read_durations(store) == {"test_a.py": 3.5, "test_b.py": 4}
+
+
+@pytest.mark.usefixtures("cfg")
+def test_merge_junit(tmp_path):
+    """The test suites of all runs are merged, their counters summed."""
+    target = Path(tmp_path) / "merged.xml"
+    merge_junit(
+        {
+            "sqlite-0": [write_report(Path(tmp_path) / "0.xml", [("a.py", 1)])],
+            "sqlite-1": [
+                write_report(Path(tmp_path) / "1.xml", [("b.py", 2), ("c.py", 3)], 1)
+            ],
+            "postgres": [Path(tmp_path) / "missing.xml"],
+        },
+        target,
+    )
+
+    root = ET.parse(target).getroot()  # nosec: xml_bad_element_tree
+    assert [suite.get("name") for suite in root] == [
+        "pytest[sqlite-0]",
+        "pytest[sqlite-1]",
+    ]
+    assert (root.get("tests"), root.get("failures"), root.get("time")) == (
+        "3",
+        "1",
+        "6.000",
+    )
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the instance snapshots of csspin-ce"""
+
+from path import Path
+
+from csspin_ce._snapshot import restore, store
+
+
+def make_instance(instancedir, marker):
+    """Create a fake instance with a database and an immutable file."""
+    (instancedir / "etc").makedirs_p()
+    (instancedir / "etc" / "dbtab").write_text(marker)
+    (instancedir / "instance.db").write_text(marker)
+    (instancedir / "wheels").makedirs_p()
+    (instancedir / "wheels" / "cs.platform.whl").write_text(marker)
+
+
+def test_snapshot_round_trip(ce_cfg, tmp_path):
+    """Instances don't share any file with their snapshots."""
+    instancedir = Path(tmp_path) / "sqlite"
+    files = ("instance.db", "etc/dbtab", "wheels/cs.platform.whl")
+    assert not restore(ce_cfg, "a" * 64, instancedir)
+
+    make_instance(instancedir, "built")
+    store(ce_cfg, "a" * 64, instancedir)
+    for name in files:
+        (instancedir / name).write_text("modified")
+    instancedir.rmtree()
+
+    assert restore(ce_cfg, "a" * 64, instancedir)
+    for name in files:
+        assert (instancedir / name).read_text() == "built"
+        # Modified in place, like by webmake or cdbpkg.
+        with open(instancedir / name, "r+", encoding="utf-8") as fd:
+            fd.write("MODIFIED")
+    instancedir.rmtree()
+
+    assert restore(ce_cfg, "a" * 64, instancedir)
+    assert all((instancedir / name).read_text() == "built" for name in files)
+
+
+def test_least_recently_used_snapshots_are_removed(ce_cfg, tmp_path):
+    """Only the snapshots used most recently are kept."""
+    instancedir = Path(tmp_path) / "sqlite"
+    make_instance(instancedir, "built")
+    directory = ce_cfg.mkinstance.snapshots.directory
+    for mtime, key in enumerate("ab"):
+        store(ce_cfg, key * 64, instancedir)
+        (directory / (key * 64)).utime((mtime, mtime))
+    restore(ce_cfg, "a" * 64, Path(tmp_path) / "restored")
+    store(ce_cfg, "c" * 64, instancedir)
+
+    assert sorted(snapshot.name[0] for snapshot in directory.dirs()) == ["a", "c"]
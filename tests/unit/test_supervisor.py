@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the supervisor of csspin-ce"""
+
+import json
+import sys
+
+import pytest
+from path import Path
+
+from csspin_ce import _supervisor
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell")
+def test_start_and_stop_detached(tmp_path):
+    """Detached processes are recorded, found by later calls and stopped."""
+    registry = Path(tmp_path) / "run" / "registry.json"
+    log = Path(tmp_path) / "run" / "services.log"
+
+    started = _supervisor.start(
+        "sleep 60",
+        registry,
+        log,
+        probes={"redis": "redis://localhost:6379"},
+    )
+
+    assert _supervisor.read_registry(registry) == started
+    assert json.loads(registry.read_text())["probes"]["redis"].endswith(":6379")
+
+    assert _supervisor.stop(registry, timeout=5)
+    assert not _supervisor.alive(started["pid"])
+    assert not registry.exists()
+    assert log.exists()
+    assert not _supervisor.stop(registry, timeout=5)
+
+
+def test_stale_registry_is_removed(tmp_path):
+    """A registry of a process that terminated meanwhile is removed."""
+    registry = Path(tmp_path) / "registry.json"
+    started = _supervisor.start(
+        f'"{sys.executable}" -c pass', registry, Path(tmp_path) / "log"
+    )
+    while _supervisor.alive(started["pid"]):
+        pass
+
+    assert _supervisor.read_registry(registry) is None
+    assert not registry.exists()
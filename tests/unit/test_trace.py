@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the provisioning trace of csspin-ce"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from path import Path
+
+from csspin_ce import _cache
+from csspin_ce._jobs import run_jobs
+from csspin_ce._trace import annotate, count, span, write_trace
+
+
+def events(cfg):
+    """The spans written to the trace file, by their name."""
+    write_trace(cfg)
+    trace = json.loads(Path(cfg.contact_elements.trace).read_text())
+    return {event["name"]: event for event in trace["traceEvents"]}
+
+
+def test_counters_propagate_to_enclosing_spans(ce_cfg):
+    """Counters are summed up in all open spans, annotations in the innermost."""
+    with span("solr", version="9.10.1"):
+        with span("fetch"):
+            count("bytes_downloaded", 100)
+            annotate(cache="miss")
+        count("bytes_downloaded", 20)
+
+    solr, fetch = events(ce_cfg)["solr"], events(ce_cfg)["fetch"]
+    assert solr["args"] == {"version": "9.10.1", "bytes_downloaded": 120}
+    assert fetch["args"] == {"bytes_downloaded": 100, "cache": "miss"}
+    assert solr["ts"] <= fetch["ts"]
+    assert solr["dur"] >= fetch["dur"]
+
+
+def test_jobs_are_traced(ce_cfg):
+    """Each job is recorded as span, failing ones are marked."""
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with patch("csspin_ce._jobs.error"), pytest.raises(Exception):
+        run_jobs({"traefik": (lambda: None, ()), "solr": (fail, ())}, max_workers=2)
+
+    recorded = events(ce_cfg)
+    assert recorded["traefik"]["ph"] == "X"
+    assert recorded["solr"]["args"] == {"failed": True}
+
+
+def test_job_counters_propagate_to_enclosing_spans(ce_cfg):
+    """Counters of jobs run by worker threads are summed up in the caller's spans."""
+    with span("ce_services.provision"):
+        run_jobs(
+            {
+                name: (lambda: count("bytes_downloaded", 10), ())
+                for name in ("traefik", "solr", "tika")
+            },
+            max_workers=3,
+        )
+
+    traced = events(ce_cfg)
+    assert traced["ce_services.provision"]["args"] == {"bytes_downloaded": 30}
+    assert traced["solr"]["args"] == {"bytes_downloaded": 10}
+
+
+def test_fetch_records_cache_usage(ce_cfg):
+    """Fetching records whether the cache has been hit and the bytes downloaded."""
+    url = "https://example.com/traefik.tar.gz"
+
+    def download(cfg, url, location):  # pylint: disable=unused-argument
+        Path(location).write_bytes(b"x" * 10)
+        count("bytes_downloaded", 10)
+
+    with patch.object(_cache, "download", side_effect=download):
+        with span("first"):
+            _cache.fetch(ce_cfg, url)
+        with span("second"):
+            _cache.fetch(ce_cfg, url)
+
+    recorded = events(ce_cfg)
+    assert recorded["first"]["args"] == {"bytes_downloaded": 10}
+    assert recorded["second"]["args"] == {}
+    assert recorded["fetch"]["args"]["cache"] == "hit"
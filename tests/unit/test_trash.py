@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the background removal of csspin-ce"""
+
+import time
+
+import pytest
+from path import Path
+
+from csspin_ce._trash import remove
+
+
+def wait_until_empty(directory, timeout=30):
+    """Wait until ``directory`` is empty, returns whether it is."""
+    deadline = time.monotonic() + timeout
+    while any(directory.iterdir()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not any(directory.iterdir())
+
+
+@pytest.mark.usefixtures("cfg")
+def test_remove_in_background(tmp_path):
+    """The directory is gone right away and removed along with leftovers."""
+    instancedir = Path(tmp_path) / "sqlite"
+    (instancedir / "storage").makedirs_p()
+    (instancedir / "storage" / "blob").write_bytes(b"\0" * 1024)
+    trash = Path(tmp_path) / "trash"
+    (trash / "sqlite.leftover").makedirs_p()
+
+    remove(instancedir, trash)
+
+    assert not instancedir.exists()
+    assert wait_until_empty(trash)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CONTACT Software GmbH
+# https://www.contact-software.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module implementing the unit tests for the utils of csspin-ce"""
+
+import io
+import random
+import tarfile
+import time
+import zipfile
+
+import pytest
+from path import Path
+
+from csspin_ce._utils import clone_tree, extract, fingerprint
+
+
+def make_hivemq_ce_zip(location, version="2025.5"):
+    """
+    Create a zip archive laid out like the HiveMQ Community Edition, i.e. a
+    large, already compressed jar next to a few hundred small text files.
+    """
+    rng = random.Random(version)
+    words = [f"word{i}" for i in range(500)]
+
+    def text(size):
+        return " ".join(rng.choice(words) for _ in range(size // 6)).encode()
+
+    base = f"hivemq-ce-{version}"
+    files = {
+        f"{base}/README.md": text(8 * 1024),
+        f"{base}/lib/hivemq.jar": rng.randbytes(16 * 1024 * 1024),
+        f"{base}/bin/run.sh": text(4 * 1024),
+        f"{base}/bin/run.bat": text(4 * 1024),
+        f"{base}/bin/init-script/hivemq": text(4 * 1024),
+        f"{base}/conf/config.xml": text(2 * 1024),
+        f"{base}/conf/logback.xml": text(4 * 1024),
+        f"{base}/extensions/hivemq-allow-all-extension/hivemq-extension.xml": text(512),
+        f"{base}/extensions/hivemq-allow-all-extension/"
+        "hivemq-allow-all-extension-1.1.0.jar": rng.randbytes(64 * 1024),
+        **{
+            f"{base}/conf/examples/configuration/config-sample-{i}.xml": text(2 * 1024)
+            for i in range(20)
+        },
+        **{
+            f"{base}/third-party-licenses/license-{i}.txt": text(24 * 1024)
+            for i in range(300)
+        },
+    }
+    with zipfile.ZipFile(location, "w", zipfile.ZIP_DEFLATED) as arc:
+        for directory in ("data/", "log/", "backup/"):
+            arc.writestr(f"{base}/{directory}", b"")
+        for name, data in files.items():
+            arc.writestr(name, data)
+    return files
+
+
+def tree(directory):
+    """Map the relative paths of all files below ``directory`` to their content."""
+    return {
+        path.relpath(directory): path.read_bytes()
+        for path in Path(directory).walkfiles()
+    }
+
+
+@pytest.mark.usefixtures("cfg")
+def test_extract_tar_member(tmp_path):
+    """Only the members of a tar archive starting with a prefix are unpacked."""
+    with tarfile.open(archive := tmp_path / "traefik.tar.gz", "w:gz") as tar:
+        for name, data in (("traefik", b"binary"), ("LICENSE.md", b"license")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    extract(archive, tmp_path / "out", "traefik")
+
+    assert tree(tmp_path / "out") == {"traefik": b"binary"}
+
+
+@pytest.mark.usefixtures("cfg")
+def test_extract_zip_concurrently(tmp_path):
+    """Zip archives unpacked by several threads equal the sequential result."""
+    files = make_hivemq_ce_zip(archive := tmp_path / "hivemq-ce.zip")
+
+    extract(archive, tmp_path / "out", "hivemq-ce-2025.5/conf", workers=4)
+
+    assert tree(tmp_path / "out") == {
+        name: data for name, data in files.items() if "/conf/" in name
+    }
+
+    extract(archive, tmp_path / "all", workers=4)
+    assert tree(tmp_path / "all") == files
+    assert (tmp_path / "all" / "hivemq-ce-2025.5" / "log").is_dir()
+
+
+@pytest.mark.benchmark
+@pytest.mark.usefixtures("cfg")
+def test_benchmark_extract_zip(tmp_path, record_property):
+    """Compare unpacking a HiveMQ CE like archive sequentially and concurrently."""
+    files = make_hivemq_ce_zip(archive := tmp_path / "hivemq-ce.zip")
+
+    timings = {}
+    for workers in (1, 4):
+        start = time.perf_counter()
+        extract(archive, target := tmp_path / f"workers-{workers}", workers=workers)
+        timings[workers] = time.perf_counter() - start
+        assert tree(target) == files
+
+    for workers, seconds in timings.items():
+        record_property(f"extract_zip_workers_{workers}", f"{seconds:.3f}")
+
+
+def test_clone_tree(tmp_path):
+    """Mutable files are copied, all others are shared where possible."""
+    source = Path(tmp_path) / "source"
+    (source / "etc").makedirs_p()
+    (source / "etc" / "dbtab").write_text("etc")
+    (source / "instance.db").write_text("db")
+    (source / "wheel.whl").write_text("wheel")
+
+    counts = clone_tree(source, target := Path(tmp_path) / "target", ["*.db", "etc"])
+
+    assert tree(target) == tree(source)
+    assert sum(counts.values()) == 3
+    assert counts["cloned"] == 3 or counts["linked"] == 1
+    for name in ("instance.db", "etc/dbtab"):
+        (target / name).write_text("modified")
+        assert (source / name).read_text() != "modified"
+
+
+def test_fingerprint():
+    """The fingerprint depends on all parts, but not on their order."""
+    assert fingerprint(options=["--dbms=sqlite"], umbrella="2026.2") == fingerprint(
+        umbrella="2026.2", options=["--dbms=sqlite"]
+    )
+    assert fingerprint(options=["--dbms=sqlite"], umbrella="2026.2") != fingerprint(
+        options=["--dbms=sqlite"], umbrella="2026.3"
+    )